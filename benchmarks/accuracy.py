@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# Ölçüm doğruluğu ve maliyeti: istemci, bilinen hız ve gecikmeye ayarlanmış
+# yerel bir bağlantı üzerinden ölçüm yapar. Bağlantı; referans sunucunun
+# önünde, her yön için paylaşılan bir jeton kovası (seri hale getirme hızı)
+# ve sabit yayılma gecikmesi uygulayan kullanıcı alanı bir vekildir.
+#
+#   python3 benchmarks/accuracy.py --rates 10M,100M,1G,10G --latencies 0,20,100 \
+#       --backends http,tcp --duration 5 --output accuracy.jsonl
+#
+# Her yapılandırma için ölçüm hatası, test süresi ve istemci CPU süresi
+# raporlanır. --output dosyasında önceki bir kayıt varsa sonuçlar onunla
+# karşılaştırılır. Sunucu ve vekil ayrı bir süreçte çalışır; CPU süresi
+# yalnızca istemciye aittir. Önce şekillendirilmemiş bağlantı ölçülür: bu
+# düzeneğin tavanıdır; tavana yakın hızlar (`harness_bound`) istemciyi
+# değil düzeneği ölçer.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from runner import MEGABIT, __version__  # noqa: E402
+from runner.backends import create_backend  # noqa: E402
+from runner.pipeline import run_test  # noqa: E402
+from runner.server import ReferenceServer  # noqa: E402
+
+SOURCE_SIZE = 16 * 1024 * 1024
+# Düzenek tavanının bu oranını aşan hızlar düzeneği ölçer
+HARNESS_MARGIN = 0.8
+READ_SIZE = 256 * 1024
+_UNITS = {'': 1, 'k': 1e3, 'm': 1e6, 'g': 1e9}
+
+
+def parse_rate(text):
+    # "10M", "1.5G", "250k" -> bit/s (ondalık birimler)
+    text = text.strip().lower().rstrip('bps').rstrip('/')
+    unit = text[-1] if text and text[-1] in _UNITS else ''
+    return float(text[:len(text) - len(unit)]) * _UNITS[unit]
+
+
+class Link:
+    # Tek yönlü bağlantı: baytlar sırayla `rate` hızında çıkar (tüm
+    # bağlantılar aynı saati paylaşır) ve `delay` saniye sonra varır.
+    # Vekil okuduğu her baytı onaylar; gerçek bir yolda bu baytlar henüz
+    # sunucuya varmamıştır. Bu farkı küçük tutmak için kuyruk tüm bağlantılarca
+    # paylaşılan bir yönlendirici tamponudur (bir yön gecikmesi kadar veri ve
+    # ~5 ms birikme) ve vekil soketlerinin alma tamponları küçüktür.
+
+    def __init__(self, rate=None, delay=0.0):
+        self.rate = rate
+        self.delay = delay
+        # Zamanlama adımı: yaklaşık 2 ms'lik veri
+        self.quantum = min(max(int(rate / 8 * 0.002), 4096), 256 * 1024) if rate else 256 * 1024
+        self.limit = max(64 * 1024, int(rate / 8 * (delay + 0.005))) if rate else 4 * 1024 * 1024
+        self.rcvbuf = min(max(int(rate / 8 * 0.005), 64 * 1024), 1024 * 1024) if rate else None
+        self.queued = 0
+        self.halves = set()
+        self._free = 0.0
+
+    def arrival(self, now, nbytes):
+        if not self.rate:
+            return now + self.delay
+        start = max(now, self._free)
+        self._free = start + nbytes * 8 / self.rate
+        return self._free + self.delay
+
+    def release(self, nbytes):
+        full = self.queued >= self.limit
+        self.queued -= nbytes
+        if full and self.queued < self.limit:
+            for half in list(self.halves):
+                half.update()
+
+
+class _Half:
+    # Vekil bağlantının bir yönü: `source`tan okunan veri zamanı gelince `dest`e yazılır
+
+    def __init__(self, link):
+        self.link = link
+        self.loop = asyncio.get_running_loop()
+        self.source = None
+        self.dest = None
+        self.queue = deque()
+        self.queued = 0
+        self.blocked = False
+        self.eof = False
+        self._timer = None
+        self._reading = True
+        self._buffer = memoryview(bytearray(READ_SIZE))
+        link.halves.add(self)
+
+    def buffer(self):
+        # Okuma kuyruğun boş yeriyle sınırlanır; kuyruk sınırı aşılmaz
+        return self._buffer[:min(READ_SIZE, max(self.link.quantum, self.link.limit - self.link.queued))]
+
+    def push(self, data):
+        view = memoryview(bytes(data))
+        now = self.loop.time()
+        for offset in range(0, len(view), self.link.quantum):
+            part = view[offset:offset + self.link.quantum]
+            self.queue.append((self.link.arrival(now, len(part)), part))
+        self.queued += len(view)
+        self.link.queued += len(view)
+        self.update()
+        self.arm()
+
+    def arm(self):
+        if self._timer is None and self.queue and self.dest is not None and not self.blocked:
+            # epoll zaman aşımını yukarı, ms'ye yuvarlar; _flush 1 ms ileriye baktığından
+            # zamanlayıcı 1 ms erken kurulur ve daha yakın teslimler beklenmez
+            when = self.queue[0][0] - 0.001
+            if when <= self.loop.time():
+                self._timer = self.loop.call_soon(self._flush)
+            else:
+                self._timer = self.loop.call_at(when, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        if self.dest is None or self.dest.is_closing():
+            self.drop()
+            return
+        now = self.loop.time() + 0.001
+        written = 0
+        while self.queue and self.queue[0][0] <= now and not self.blocked:
+            _, part = self.queue.popleft()
+            written += len(part)
+            self.dest.write(part)
+        self.queued -= written
+        self.link.release(written)
+        if self.eof and not self.queue:
+            self.dest.close()
+        self.update()
+        self.arm()
+
+    def update(self):
+        reading = self.link.queued < self.link.limit and not self.blocked
+        if reading != self._reading and self.source is not None and not self.source.is_closing():
+            if reading:
+                self.source.resume_reading()
+            else:
+                self.source.pause_reading()
+            self._reading = reading
+
+    def pause(self):
+        self.blocked = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.update()
+
+    def resume(self):
+        self.blocked = False
+        self.update()
+        self.arm()
+
+    def finish(self):
+        # Kaynak kapandı; kuyruktaki veri teslim edildikten sonra hedef kapanır
+        self.eof = True
+        if not self.queue and self.dest is not None:
+            self.dest.close()
+
+    def drop(self):
+        # Hedef kapandı; bekleyen veri atılır ve kaynak da kapatılır
+        self.queue.clear()
+        self.link.halves.discard(self)
+        self.link.release(self.queued)
+        self.queued = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.source is not None:
+            self.source.close()
+
+
+class _End(asyncio.BufferedProtocol):
+    def __init__(self, reading, writing):
+        self.reading = reading
+        self.writing = writing
+
+    def connection_made(self, transport):
+        sock = transport.get_extra_info('socket')
+        if self.reading.link.rcvbuf and sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.reading.link.rcvbuf)
+        self.reading.source = transport
+        self.writing.dest = transport
+        self.writing.arm()
+
+    def get_buffer(self, sizehint):
+        return self.reading.buffer()
+
+    def buffer_updated(self, nbytes):
+        self.reading.push(self.reading.buffer()[:nbytes])
+
+    def eof_received(self):
+        return False
+
+    def connection_lost(self, exc):
+        self.reading.finish()
+        self.writing.drop()
+
+    def pause_writing(self):
+        self.writing.pause()
+
+    def resume_writing(self):
+        self.writing.resume()
+
+
+class ShapedServer:
+    # Referans sunucu ve önündeki şekillendirici vekil; `latency` gidiş-dönüş süresidir (s)
+
+    def __init__(self, rate=None, latency=0.0, source_size=SOURCE_SIZE):
+        self.rate = rate
+        self.latency = latency
+        self.origin = ReferenceServer('127.0.0.1', 0, source_size)
+        self.down = Link(rate, latency / 2)
+        self.up = Link(rate, latency / 2)
+        self._server = None
+
+    @property
+    def address(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'{host}:{port}'
+
+    async def start(self):
+        await self.origin.start()
+        self._server = await asyncio.get_running_loop().create_server(self._accept, '127.0.0.1', 0)
+        return self
+
+    def _accept(self):
+        up, down = _Half(self.up), _Half(self.down)
+        host, port = self.origin.address.rsplit(':', 1)
+        asyncio.get_running_loop().create_task(self._connect(up, down, host, int(port)))
+        return _End(up, down)
+
+    async def _connect(self, up, down, host, port):
+        try:
+            await asyncio.get_running_loop().create_connection(lambda: _End(down, up), host, port)
+        except OSError:
+            down.finish()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        await self.origin.close()
+
+
+def _serve(rate, latency, connection):
+    async def serve():
+        server = await ShapedServer(rate, latency).start()
+        connection.send(server.address)
+        await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+        await server.close()
+
+    asyncio.run(serve())
+
+
+def measure(backend_name, rate, latency, options):
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(rate, latency, child), daemon=True)
+    process.start()
+    try:
+        address = parent.recv()
+        backend = create_backend(backend_name, servers=[address], **options)
+        cpu, wall = time.process_time(), time.perf_counter()
+        result = asyncio.run(run_test(backend))
+        return result, time.perf_counter() - wall, time.process_time() - cpu
+    finally:
+        parent.send('stop')
+        process.join(10)
+        if process.is_alive():
+            process.terminate()
+
+
+def error(measured, expected):
+    return (measured - expected) / expected if expected else None
+
+
+def record(backend, rate, latency, runs, ceiling):
+    def median(values):
+        values = [value for value in values if value is not None]
+        return statistics.median(values) if values else None
+
+    entry = {'backend': backend, 'rate_mbps': rate / MEGABIT if rate else None, 'latency_ms': latency * 1000,
+             'runs': len(runs)}
+    for phase in ('download', 'upload'):
+        measured = median(getattr(result, phase).bits_per_second for result, _, _ in runs)
+        steady = median(getattr(result, phase).steady_bits_per_second for result, _, _ in runs)
+        entry[f'{phase}_mbps'] = measured / MEGABIT
+        entry[f'{phase}_steady_mbps'] = steady / MEGABIT if steady else None
+        entry[f'{phase}_error'] = error(measured, rate) if rate else None
+        entry[f'{phase}_steady_error'] = error(steady, rate) if rate and steady else None
+    entry['ping_ms'] = median(result.ping for result, _, _ in runs)
+    entry['ping_error_ms'] = entry['ping_ms'] - latency * 1000
+    entry['duration_s'] = median(duration for _, duration, _ in runs)
+    entry['cpu_s'] = median(cpu for _, _, cpu in runs)
+    entry['harness_bound'] = bool(rate and ceiling and rate > HARNESS_MARGIN * ceiling)
+    return entry
+
+
+def key(entry):
+    return entry['backend'], entry['rate_mbps'], entry['latency_ms']
+
+
+def format_table(entries, previous=None):
+    def percent(value):
+        return f'{value * 100:+.1f}%' if value is not None else '-'
+
+    previous = {key(entry): entry for entry in previous or ()}
+    lines = [f"{'backend':<8}{'rate':>10}{'rtt ms':>8}{'down err':>10}{'up err':>10}{'ping err':>10}"
+             f"{'time s':>8}{'cpu s':>8}"]
+    for entry in entries:
+        rate = f"{entry['rate_mbps']:g}M" if entry['rate_mbps'] else 'ceiling'
+        if entry['rate_mbps'] is None:
+            errors = f"{entry['download_mbps']:>9.0f}M{entry['upload_mbps']:>9.0f}M"
+        else:
+            errors = f"{percent(entry['download_error']):>10}{percent(entry['upload_error']):>10}"
+        line = (f"{entry['backend']:<8}{rate:>10}{entry['latency_ms']:>8g}{errors}"
+                f"{entry['ping_error_ms']:>+10.2f}{entry['duration_s']:>8.2f}{entry['cpu_s']:>8.2f}")
+        if entry['harness_bound']:
+            line += '  harness-bound'
+        before = previous.get(key(entry))
+        if before is not None:
+            changes = []
+            for name in ('download_error', 'upload_error'):
+                if entry[name] is not None and before.get(name) is not None:
+                    changes.append(f'|{name.split("_")[0]}| {(abs(entry[name]) - abs(before[name])) * 100:+.1f}pp')
+            changes.append(f"cpu {entry['cpu_s'] - before['cpu_s']:+.2f}s")
+            line += '  (' + ', '.join(changes) + ')'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def last_record(path):
+    if not path or not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Runner accuracy against a traffic-shaped local server')
+    parser.add_argument('--rates', default='10M,100M,1G,10G',
+                        help='comma-separated link rates in bit/s, k/M/G suffixes (default: %(default)s)')
+    parser.add_argument('--latencies', default='0,20,100',
+                        help='comma-separated round-trip times in ms (default: %(default)s)')
+    parser.add_argument('--backends', default='http', help='comma-separated backends (default: %(default)s)')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per phase (default: %(default)s)')
+    parser.add_argument('--streams', type=int, default=4)
+    parser.add_argument('--max-streams', type=int, default=16)
+    parser.add_argument('--adaptive', action='store_true', help='end phases once throughput converges')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per configuration; medians are reported')
+    parser.add_argument('--max-error', type=float,
+                        help='exit with status 1 if any non harness-bound |error| exceeds this fraction')
+    parser.add_argument('--output', help='append the results as a JSON line to this file and compare '
+                                         'with its previous record')
+    args = parser.parse_args()
+
+    rates = [parse_rate(rate) for rate in args.rates.split(',') if rate.strip()]
+    latencies = [float(latency) / 1000 for latency in args.latencies.split(',') if latency.strip()]
+    options = {'duration': args.duration, 'streams': args.streams, 'max_streams': args.max_streams,
+               'adaptive': args.adaptive}
+
+    entries = []
+    for backend in args.backends.split(','):
+        runs = [measure(backend, None, 0.0, options) for _ in range(args.repeat)]
+        top = record(backend, None, 0.0, runs, None)
+        entries.append(top)
+        ceiling = min(top['download_mbps'], top['upload_mbps']) * MEGABIT
+        for rate in rates:
+            for latency in latencies:
+                runs = [measure(backend, rate, latency, options) for _ in range(args.repeat)]
+                entries.append(record(backend, rate, latency, runs, ceiling))
+                print(format_table(entries[-1:]).splitlines()[1], file=sys.stderr, flush=True)
+
+    previous = last_record(args.output)
+    summary = {
+        'timestamp': time.time(),
+        'version': __version__,
+        'commit': commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'options': dict(options, repeat=args.repeat),
+        'results': entries,
+    }
+    print(format_table(entries, previous['results'] if previous else None))
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(summary) + '\n')
+
+    if args.max_error is not None:
+        for entry in entries:
+            if entry['harness_bound']:
+                continue
+            for name in ('download_error', 'upload_error'):
+                if entry[name] is not None and abs(entry[name]) > args.max_error:
+                    return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
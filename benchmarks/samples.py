@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# Ham verim örneklerinin bellek kullanımı: sözlük listesi, namedtuple listesi
+# ve sütun tabanlı SampleSeries.
+#
+#   python3 benchmarks/samples.py --count 1000000
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runner import MEGABIT  # noqa: E402
+from runner.sampling import Sample, SampleSeries  # noqa: E402
+
+
+def rows(count):
+    for i in range(count):
+        nbytes = random.randrange(1, 12_500_000)
+        yield i * 0.1, nbytes, nbytes * 8 / 0.1 / MEGABIT
+
+
+def build_dicts(count):
+    return [{'time': t, 'nbytes': n, 'mbps': m} for t, n, m in rows(count)]
+
+
+def build_tuples(count):
+    return [Sample(t, n, m) for t, n, m in rows(count)]
+
+
+def build_series(count):
+    series = SampleSeries()
+    for values in rows(count):
+        series.append(values)
+    return series
+
+
+def measure(builder, count):
+    random.seed(0)
+    tracemalloc.start()
+    started = time.perf_counter()
+    container = builder(count)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    return {'bytes': current, 'bytes_per_sample': current / count, 'build_s': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare memory use of sample containers')
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+
+    report = {'count': args.count}
+    for name, builder in (('list_of_dicts', build_dicts), ('list_of_namedtuples', build_tuples),
+                          ('sample_series', build_series)):
+        report[name] = measure(builder, args.count)
+    report['ratio_vs_dicts'] = report['list_of_dicts']['bytes'] / report['sample_series']['bytes']
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# GUI açılış süresi: modül içe aktarma ve ilk çizime kadar geçen süre.
+#
+#   python3 benchmarks/startup.py --runs 5 --budget-ms 800 --output startup.jsonl
+#
+# Bütçe aşılırsa ya da ölçüm yığını açılışta yüklenirse çıkış kodu 1 olur.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_once(timeout):
+    env = dict(os.environ, RUNNER_STARTUP_BENCHMARK='1')
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'runner.py')],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout, check=True
+    )
+    wall = (time.perf_counter() - started) * 1000
+    for line in completed.stdout.splitlines():
+        if line.startswith('{'):
+            record = json.loads(line)
+            record['process_ms'] = wall
+            return record
+    raise RuntimeError(f'runner.py did not report startup timings:\n{completed.stderr}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Runner GUI startup time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000.0,
+                        help='maximum median time to first paint (default: %(default)s)')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--output', help='append the summary as a JSON line to this file')
+    args = parser.parse_args()
+
+    runs = [measure_once(args.timeout) for _ in range(args.runs)]
+    summary = {
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'runs': len(runs),
+    }
+    for key in ('import_ms', 'first_paint_ms', 'assets_ms', 'process_ms'):
+        summary[key] = statistics.median(run[key] for run in runs)
+    summary['measurement_loaded'] = any(run['measurement_loaded'] for run in runs)
+    summary['budget_ms'] = args.budget_ms
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'a') as f:
+            f.write(json.dumps(summary) + '\n')
+
+    failed = summary['first_paint_ms'] > args.budget_ms or summary['measurement_loaded']
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,21 @@
+import time
+
+# Başlangıç ölçümü (bkz. benchmarks/startup.py)
+STARTED = time.perf_counter()
+
+import json
 import os
 import sys
+import threading
+from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QLabel, QVBoxLayout, QWidget, QPushButton,
-    QProgressBar, QDialog, QHBoxLayout, QComboBox
+    QProgressBar, QDialog, QHBoxLayout, QComboBox, QFileDialog
 )
-from PyQt5.QtGui import QFont, QIcon, QPixmap
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSettings
+from PyQt5.QtGui import QColor, QFont, QIcon, QPainter, QPen, QPixmap, QPolygonF
+from PyQt5.QtCore import Qt, QPointF, QRectF, QThread, QTimer, pyqtSignal, QSettings
+
+from runner import MEGABIT
 
 # PyInstaller uyumluluğu için
 try:
@@ -14,7 +24,10 @@ try:
 except ImportError:
     pass
 
-import speedtest
+# Ölçüm yığını (asyncio, speedtest-cli, runner.*) ilk testte iş parçacığında
+# içe aktarılır; pencere açılışını geciktirmez.
+
+IMPORTED = time.perf_counter()
 
 # Çeviri sözlüğü
 TRANSLATIONS = {
@@ -24,15 +37,33 @@ TRANSLATIONS = {
         'connection_measuring': 'Bağlantı Durumu: Ölçüyor...',
         'connection_completed': 'Bağlantı Durumu: Tamamlandı',
         'connection_error': 'Bağlantı Durumu: Hata!',
+        'connection_cancelled': 'Bağlantı Durumu: İptal edildi (kısmi sonuç)',
         'ping': 'Ping',
         'download': 'İndirme',
         'upload': 'Yükleme',
         'start': 'Başlat',
+        'cancel': 'İptal',
         'about': 'Hakkında',
         'close': 'Kapat',
+        'history': 'Geçmiş',
+        'history_empty': 'Bu aralıkta kayıtlı ölçüm yok.',
+        'range_day': 'Son 24 saat',
+        'range_week': 'Son 7 gün',
+        'range_month': 'Son 30 gün',
+        'range_year': 'Son 1 yıl',
+        'range_all': 'Tümü',
+        'export': 'Dışa aktar',
+        'export_done': '{count} ölçüm dışa aktarıldı.',
+        'export_failed': 'Dışa aktarma başarısız',
+        'history_failed': 'Geçmiş kaydedilemedi',
+        'history_load_failed': 'Geçmiş okunamadı',
         'language': 'Dil',
         'logo_not_found': 'Logo bulunamadı.',
         'speedtest_failed': 'Speedtest başarısız',
+        'steady': 'Kararlı',
+        'ramp': 'Isınma',
+        'jitter': 'Titreşim',
+        'loaded': 'Yük altında',
         'about_text': '''
             <h2>Runner SpeedTest</h2>
             <p>Bu uygulama, internet bağlantı hızınızı ölçmek için geliştirilmiştir.</p>
@@ -54,15 +85,33 @@ TRANSLATIONS = {
         'connection_measuring': 'Connection Status: Measuring...',
         'connection_completed': 'Connection Status: Completed',
         'connection_error': 'Connection Status: Error!',
+        'connection_cancelled': 'Connection Status: Cancelled (partial result)',
         'ping': 'Ping',
         'download': 'Download',
         'upload': 'Upload',
         'start': 'Start',
+        'cancel': 'Cancel',
         'about': 'About',
         'close': 'Close',
+        'history': 'History',
+        'history_empty': 'No saved measurements in this range.',
+        'range_day': 'Last 24 hours',
+        'range_week': 'Last 7 days',
+        'range_month': 'Last 30 days',
+        'range_year': 'Last year',
+        'range_all': 'All',
+        'export': 'Export',
+        'export_done': '{count} measurements exported.',
+        'export_failed': 'Export failed',
+        'history_failed': 'Could not save history',
+        'history_load_failed': 'Could not read history',
         'language': 'Language',
         'logo_not_found': 'Logo not found.',
         'speedtest_failed': 'Speedtest failed',
+        'steady': 'Steady',
+        'ramp': 'Ramp-up',
+        'jitter': 'Jitter',
+        'loaded': 'Under load',
         'about_text': '''
             <h2>Runner SpeedTest</h2>
             <p>This application is developed to measure your internet connection speed.</p>
@@ -97,40 +146,98 @@ def get_icon_path():
 
 LOGO_PATH = get_logo_path()
 ICON_PATH = get_icon_path()
-
+# Pencere kapanırken süren testin durması için beklenecek en uzun süre
+CLOSE_TIMEOUT_MS = 3000
 
 class SpeedTestThread(QThread):
     speed_test_completed = pyqtSignal(float, float, float)
     speed_test_failed = pyqtSignal(str)
+    # İptal edilen test; kısmi sonuç self.result'tadır
+    speed_test_cancelled = pyqtSignal()
     progress_signal = pyqtSignal(int)
+    # Canlı ölçüm: faz adı ('download'/'upload') ve Mbps
+    throughput_signal = pyqtSignal(str, float)
 
-    def __init__(self, language='tr'):
+    def __init__(self, language='tr', engine='speedtest', adaptive=False, loaded_latency=False,
+                 source_address=None):
         super().__init__()
         self.language = language
+        # Ölçüm arka ucu: 'speedtest' (speedtest-cli), 'native'/'http' ya da 'tcp'
+        self.engine = engine
+        # Yerleşik motorda verim yakınsayınca fazı erken bitir
+        self.adaptive = adaptive
+        # Yerleşik motorda indirme/yükleme sırasında da gecikme ölç
+        self.loaded_latency = loaded_latency
+        # Ölçümün yapılacağı yerel adres ya da arayüz (ör. "eth1"); boşsa varsayılan rota
+        self.source_address = source_address
+        self.result = None
+        # Yapılandırma, seçilen sunucu ve bağlantılar testler arasında sıcak kalır
+        self.worker = None
+        self._lock = threading.Lock()
+        self._cancel = None
+        self._cancel_requested = False
+
+    def cancel(self):
+        # Arayüz iş parçacığından çağrılır; akışlar ölçüm döngüsünde kesilir
+        with self._lock:
+            self._cancel_requested = True
+            token = self._cancel
+        if token is not None:
+            token.cancel()
+
+    def start(self, *args):
+        # Önceki testin bitişiyle sonuç sinyali arasında gelen geç iptal yeni testi kesmez
+        with self._lock:
+            self._cancel_requested = False
+        super().start(*args)
+
+    def close(self, timeout=None):
+        if self.worker is not None:
+            self.worker.close(timeout)
+            self.worker = None
+
+    def create_backend(self):
+        from runner.backends import create_backend
+        from runner.interfaces import resolve_source
+
+        source = resolve_source(self.source_address) if self.source_address else None
+        if self.engine == 'speedtest':
+            return create_backend(self.engine, source_address=source)
+        return create_backend(self.engine, source_address=source, adaptive=self.adaptive,
+                              loaded_latency=self.loaded_latency)
 
     def run(self):
+        self.result = None
         try:
-            st = speedtest.Speedtest()
-            self.progress_signal.emit(10)
-            
-            st.get_best_server()
-            self.progress_signal.emit(30)
-            
-            ping = st.results.ping if st.results.ping else 0
-            
-            download_bits = st.download()
-            download_speed = round(download_bits / 1024 / 1024, 2)
-            self.progress_signal.emit(70)
-            
-            upload_bits = st.upload()
-            upload_speed = round(upload_bits / 1024 / 1024, 2)
+            from runner.pipeline import CancelToken
+            from runner.worker import BackgroundWorker
+
+            with self._lock:
+                self._cancel = CancelToken()
+                if self._cancel_requested:
+                    self._cancel.cancel()
+            if self.worker is None:
+                self.worker = BackgroundWorker(self.create_backend)
+            self.result = self.worker.measure(self.progress_signal.emit, self._emit_sample, self._cancel)
+            if self.result.cancelled:
+                self.speed_test_cancelled.emit()
+                return
+            download_speed = round(self.result.download.bits_per_second / MEGABIT, 2)
+            upload_speed = round(self.result.upload.bits_per_second / MEGABIT, 2)
             self.progress_signal.emit(100)
             
-            self.speed_test_completed.emit(ping, download_speed, upload_speed)
+            self.speed_test_completed.emit(self.result.ping, download_speed, upload_speed)
             
         except Exception as e:
             error_msg = f"{TRANSLATIONS[self.language]['speedtest_failed']}: {str(e)}"
             self.speed_test_failed.emit(error_msg)
+        finally:
+            with self._lock:
+                self._cancel = None
+                self._cancel_requested = False
+
+    def _emit_sample(self, phase, sample):
+        self.throughput_signal.emit(phase, sample.mbps)
 
 
 class AboutDialog(QDialog):
@@ -170,6 +277,208 @@ class AboutDialog(QDialog):
         layout.addLayout(close_layout)
 
 
+class HistoryChart(QWidget):
+    # Üst panel indirme/yükleme (Mbps), alt panel ping (ms). Seriler çizim
+    # genişliği kadar noktaya LTTB ile indirgenir; indirgeme yalnızca veri ya
+    # da boyut değiştiğinde yapılır, boyama hazır çoklu çizgileri kullanır.
+
+    SERIES = (('download', '#9b59b6', 0), ('upload', '#27ae60', 0), ('ping', '#f39c12', 1))
+    MARGIN = 48
+
+    def __init__(self, parent=None, language='tr'):
+        super().__init__(parent)
+        self.language = language
+        self.setMinimumSize(480, 300)
+        self.series = {}
+        self._lines = None
+
+    def set_rows(self, rows):
+        self.series = {}
+        for name, _, _ in self.SERIES:
+            scale = 1 if name == 'ping' else 1 / MEGABIT
+            points = [(row['timestamp'], row[name] * scale) for row in rows if row[name] is not None]
+            self.series[name] = ([x for x, _ in points], [y for _, y in points])
+        self._lines = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self._lines = None
+        super().resizeEvent(event)
+
+    def panels(self):
+        width = self.width() - 2 * self.MARGIN
+        height = (self.height() - 3 * 16) / 3
+        top = QRectF(self.MARGIN, 16, width, height * 2)
+        bottom = QRectF(self.MARGIN, 32 + height * 2, width, height)
+        return top, bottom
+
+    def _build_lines(self):
+        from runner.sampling import lttb
+
+        # Seriler zamana göre sıralı; uçlar ilk ve son noktalardır
+        xs = [x for series_xs, _ in self.series.values() if series_xs for x in (series_xs[0], series_xs[-1])]
+        if not xs:
+            return {}, (0, 0), (0, 0)
+        x_min, x_max = min(xs), max(xs)
+        y_max = [1e-9, 1e-9]
+        for name, _, panel in self.SERIES:
+            ys = self.series[name][1]
+            if ys:
+                y_max[panel] = max(y_max[panel], max(ys))
+        panels = self.panels()
+        lines = {}
+        for name, _, panel in self.SERIES:
+            series_xs, series_ys = self.series[name]
+            rect = panels[panel]
+            keep = lttb(series_xs, series_ys, max(3, int(rect.width())))
+            span = (x_max - x_min) or 1.0
+            lines[name] = QPolygonF([
+                QPointF(rect.left() + (series_xs[i] - x_min) / span * rect.width(),
+                        rect.bottom() - series_ys[i] / y_max[panel] * rect.height())
+                for i in keep
+            ])
+        return lines, (x_min, x_max), tuple(y_max)
+
+    def paintEvent(self, event):
+        if self._lines is None:
+            self._lines = self._build_lines()
+        lines, (x_min, x_max), y_max = self._lines
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(QFont("Arial", 8))
+        grid = QPen(QColor('#34495e'))
+        for panel, (rect, unit) in enumerate(zip(self.panels(), ('Mbps', 'ms'))):
+            painter.setPen(grid)
+            painter.drawRect(rect)
+            if not lines:
+                continue
+            painter.setPen(QColor('white'))
+            painter.drawText(QRectF(0, rect.top() - 6, self.MARGIN - 4, 14), Qt.AlignRight,
+                             f"{y_max[panel]:.0f}")
+            painter.drawText(QRectF(0, rect.bottom() - 8, self.MARGIN - 4, 14), Qt.AlignRight, unit)
+        if not lines:
+            return
+        bottom = self.panels()[1]
+        for x, align in ((x_min, Qt.AlignLeft), (x_max, Qt.AlignRight)):
+            painter.drawText(QRectF(bottom.left(), bottom.bottom() + 2, bottom.width(), 14), align,
+                             datetime.fromtimestamp(x).strftime('%d.%m.%Y %H:%M'))
+        legend = self.MARGIN
+        for name, color, _ in self.SERIES:
+            painter.setPen(QPen(QColor(color), 1.5))
+            painter.drawPolyline(lines[name])
+            painter.drawText(QRectF(legend, 0, 100, 14), Qt.AlignLeft, TRANSLATIONS[self.language][name])
+            legend += 100
+
+
+class HistoryDialog(QDialog):
+    RANGES = (('range_day', 1), ('range_week', 7), ('range_month', 30), ('range_year', 365), ('range_all', None))
+
+    def __init__(self, store, parent=None, language='tr'):
+        super().__init__(parent)
+        self.store = store
+        self.language = language
+        self.setWindowTitle(TRANSLATIONS[language]['history'])
+        self.resize(640, 420)
+        self.setStyleSheet("""
+            background-color: #0f2734;
+            color: white;
+            font-family: Arial;
+        """)
+
+        layout = QVBoxLayout(self)
+        self.range_combo = QComboBox()
+        self.range_combo.addItems([TRANSLATIONS[language][key] for key, _ in self.RANGES])
+        self.range_combo.setCurrentIndex(2)
+        self.range_combo.setStyleSheet("""
+            background-color: #34495e;
+            color: white;
+            border-radius: 5px;
+            padding: 5px;
+        """)
+        self.range_combo.currentIndexChanged.connect(self.load)
+        layout.addWidget(self.range_combo)
+
+        self.chart = HistoryChart(self, language)
+        layout.addWidget(self.chart)
+
+        self.empty_label = QLabel(TRANSLATIONS[language]['history_empty'])
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.empty_label)
+
+        close_button = QPushButton(TRANSLATIONS[language]['close'])
+        close_button.clicked.connect(self.close)
+        close_button.setStyleSheet("""
+            background-color: #7d26b2;
+            color: white;
+            font-weight: bold;
+            padding: 10px;
+            border-radius: 10px;
+        """)
+        close_button.setFixedSize(100, 40)
+
+        export_button = QPushButton(TRANSLATIONS[language]['export'])
+        export_button.clicked.connect(self.export)
+        export_button.setStyleSheet("""
+            background-color: #34495e;
+            color: white;
+            padding: 10px;
+            border-radius: 10px;
+        """)
+        export_button.setFixedSize(100, 40)
+
+        close_layout = QHBoxLayout()
+        close_layout.addWidget(export_button)
+        close_layout.addStretch()
+        close_layout.addWidget(close_button)
+        layout.addLayout(close_layout)
+
+        self.load()
+
+    def since(self):
+        days = self.RANGES[self.range_combo.currentIndex()][1]
+        return datetime.now().timestamp() - days * 24 * 60 * 60 if days else None
+
+    def load(self):
+        import sqlite3
+
+        # Kuyruktaki son sonuç da görünsün
+        try:
+            self.store.flush()
+            rows = list(self.store.query(since=self.since(), columns=('timestamp', 'ping', 'download', 'upload')))
+        except sqlite3.Error as e:
+            self.chart.set_rows([])
+            self.empty_label.setText(f"{TRANSLATIONS[self.language]['history_load_failed']}: {e}")
+            self.empty_label.setVisible(True)
+            return
+        self.chart.set_rows(rows)
+        self.empty_label.setText(TRANSLATIONS[self.language]['history_empty'])
+        self.empty_label.setVisible(not rows)
+
+    def export(self):
+        # Seçili aralık akış halinde yazılır; biçim dosya uzantısından seçilir
+        import sqlite3
+
+        from runner.export import EXTENSIONS, export_history
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, TRANSLATIONS[self.language]['export'], 'runner-history.csv',
+            'CSV (*.csv);;JSON Lines (*.jsonl);;Runner columnar (*.rcol)'
+        )
+        if not path:
+            return
+        fmt = next((fmt for fmt, extension in EXTENSIONS.items() if path.endswith(extension)), 'csv')
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            count = export_history(self.store, path, fmt, since=self.since())
+            message = TRANSLATIONS[self.language]['export_done'].format(count=count)
+        except (OSError, sqlite3.Error) as e:
+            message = f"{TRANSLATIONS[self.language]['export_failed']}: {e}"
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.empty_label.setText(message)
+        self.empty_label.setVisible(True)
+
+
 class SpeedTestApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -177,6 +486,15 @@ class SpeedTestApp(QMainWindow):
         # QSettings ile dil ayarını yükle
         self.settings = QSettings('ALGYazilim', 'RunnerSpeedTest')
         self.language = self.settings.value('language', 'tr')
+        self.engine = self.settings.value('engine', 'speedtest')
+        self.adaptive = self.settings.value('adaptive', False, type=bool)
+        self.loaded_latency = self.settings.value('loaded_latency', False, type=bool)
+        self.source_address = self.settings.value('source_address', '') or None
+        # Sonuç geçmişi (SQLite); ilk sonuçta açılır
+        self.history = None
+        # İsteğe bağlı OpenMetrics uç noktası (0 = kapalı)
+        self.metrics_port = self.settings.value('metrics_port', 0, type=int)
+        self.metrics = None
         
         self.setGeometry(800, 200, 800, 600)
         self.setStyleSheet("""
@@ -213,9 +531,11 @@ class SpeedTestApp(QMainWindow):
         lang_layout.addStretch()
         layout.addLayout(lang_layout)
 
+        # Logo ilk çizimden sonra yüklenir; yer şimdiden ayrılır
         self.logo_label = QLabel()
-        self.set_logo()
+        self.logo_label.setMinimumSize(200, 100)
         self.logo_label.setAlignment(Qt.AlignCenter)
+        self._painted = False
         layout.addWidget(self.logo_label)
 
         self.connection_status_label = QLabel()
@@ -246,6 +566,19 @@ class SpeedTestApp(QMainWindow):
         self.start_button.clicked.connect(self.start_speed_test)
         layout.addWidget(self.start_button)
 
+        self.cancel_button = QPushButton()
+        self.cancel_button.setFont(QFont("Arial", 16))
+        self.cancel_button.setStyleSheet("""
+            background-color: #c0392b; 
+            color: white; 
+            border-radius: 15px;
+            padding: 10px;
+            font-weight: bold;
+        """)
+        self.cancel_button.clicked.connect(self.cancel_speed_test)
+        self.cancel_button.setVisible(False)
+        layout.addWidget(self.cancel_button)
+
         self.about_button = QPushButton()
         self.about_button.setFont(QFont("Arial", 10))
         self.about_button.setStyleSheet("""
@@ -255,7 +588,21 @@ class SpeedTestApp(QMainWindow):
             padding: 3px;
         """)
         self.about_button.clicked.connect(self.show_about_dialog)
-        layout.addWidget(self.about_button)
+
+        self.history_button = QPushButton()
+        self.history_button.setFont(QFont("Arial", 10))
+        self.history_button.setStyleSheet("""
+            background-color: #34495e; 
+            color: white; 
+            border-radius: 10px;
+            padding: 3px;
+        """)
+        self.history_button.clicked.connect(self.show_history_dialog)
+
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(self.history_button)
+        buttons_layout.addWidget(self.about_button)
+        layout.addLayout(buttons_layout)
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 100)
@@ -269,14 +616,46 @@ class SpeedTestApp(QMainWindow):
         """)
         layout.addWidget(self.progress_bar)
 
-        self.speed_test_thread = SpeedTestThread(self.language)
+        self.speed_test_thread = SpeedTestThread(
+            self.language, self.engine, self.adaptive, self.loaded_latency, self.source_address
+        )
         self.speed_test_thread.speed_test_completed.connect(self.display_speed_test_results)
         self.speed_test_thread.speed_test_failed.connect(self.handle_speed_test_error)
+        self.speed_test_thread.speed_test_cancelled.connect(self.display_partial_results)
         self.speed_test_thread.progress_signal.connect(self.update_progress_bar)
+        self.speed_test_thread.throughput_signal.connect(self.update_live_speed)
         
         # UI'yi güncelle
         self.update_ui_language()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            QTimer.singleShot(0, self.first_painted)
+
+    def first_painted(self):
+        painted = time.perf_counter()
+        self.set_logo()
+        self.start_metrics()
+        if os.environ.get('RUNNER_STARTUP_BENCHMARK'):
+            print(json.dumps({
+                'import_ms': (IMPORTED - STARTED) * 1000,
+                'first_paint_ms': (painted - STARTED) * 1000,
+                'assets_ms': (time.perf_counter() - painted) * 1000,
+                'measurement_loaded': 'runner.pipeline' in sys.modules,
+            }), flush=True)
+            QApplication.quit()
+
+    def start_metrics(self):
+        if not self.metrics_port:
+            return
+        from runner.metrics import MetricsExporter
+        try:
+            self.metrics = MetricsExporter(port=self.metrics_port).start()
+        except OSError as e:
+            print(f'runner: metrics endpoint unavailable: {e}', file=sys.stderr)
+
     def change_language(self, text):
         self.language = 'tr' if text == 'Türkçe' else 'en'
         self.settings.setValue('language', self.language)
@@ -290,7 +669,9 @@ class SpeedTestApp(QMainWindow):
         self.download_label.setText(f"{TRANSLATIONS[self.language]['download']}: 0 Mbps")
         self.upload_label.setText(f"{TRANSLATIONS[self.language]['upload']}: 0 Mbps")
         self.start_button.setText(TRANSLATIONS[self.language]['start'])
+        self.cancel_button.setText(TRANSLATIONS[self.language]['cancel'])
         self.about_button.setText(TRANSLATIONS[self.language]['about'])
+        self.history_button.setText(TRANSLATIONS[self.language]['history'])
 
     def set_logo(self):
         if LOGO_PATH:
@@ -306,30 +687,144 @@ class SpeedTestApp(QMainWindow):
 
         self.connection_status_label.setText(TRANSLATIONS[self.language]['connection_measuring'])
         self.start_button.setVisible(False)
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.setVisible(True)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.speed_test_thread.start()
 
+    def cancel_speed_test(self):
+        self.cancel_button.setEnabled(False)
+        self.speed_test_thread.cancel()
+
     def update_progress_bar(self, value):
         self.progress_bar.setValue(value)
 
+    def update_live_speed(self, phase, speed):
+        label = self.download_label if phase == 'download' else self.upload_label
+        label.setText(f"{TRANSLATIONS[self.language][phase]}: {speed:.2f} Mbps")
+
     def display_speed_test_results(self, ping, download_speed, upload_speed):
         self.ping_label.setText(f"{TRANSLATIONS[self.language]['ping']}: {ping:.0f} ms")
         self.download_label.setText(f"{TRANSLATIONS[self.language]['download']}: {download_speed:.2f} Mbps")
         self.upload_label.setText(f"{TRANSLATIONS[self.language]['upload']}: {upload_speed:.2f} Mbps")
+        self.show_latency_details()
+        self.show_steady_state()
+        # Geçmiş yazılamazsa hata iletisi tamamlandı durumunun yerine geçer
         self.connection_status_label.setText(TRANSLATIONS[self.language]['connection_completed'])
+        self.record_result()
+        self.start_button.setVisible(True)
+        self.cancel_button.setVisible(False)
+        self.progress_bar.setVisible(False)
+
+    def display_partial_results(self):
+        # İptal edilen testin tamamlanan kısmı gösterilir; geçmişe yazılmaz
+        result = self.speed_test_thread.result
+        self.ping_label.setText(f"{TRANSLATIONS[self.language]['ping']}: {result.ping:.0f} ms")
+        for phase, label in (('download', self.download_label), ('upload', self.upload_label)):
+            phase_result = getattr(result, phase)
+            speed = phase_result.bits_per_second / MEGABIT if phase_result is not None else 0.0
+            label.setText(f"{TRANSLATIONS[self.language][phase]}: {speed:.2f} Mbps")
+        self.connection_status_label.setText(TRANSLATIONS[self.language]['connection_cancelled'])
         self.start_button.setVisible(True)
+        self.cancel_button.setVisible(False)
         self.progress_bar.setVisible(False)
 
+    def show_latency_details(self):
+        result = self.speed_test_thread.result
+        latency = result.latency if result is not None else None
+        if not latency or latency.get('count', 0) < 2:
+            return
+        self.ping_label.setText(
+            f"{TRANSLATIONS[self.language]['ping']}: {latency['p50']:.1f} ms<br>"
+            f"<span style='font-size: 11px;'>{TRANSLATIONS[self.language]['jitter']}: "
+            f"{latency['jitter']:.1f} ms | p95: {latency['p95']:.1f} | p99: {latency['p99']:.1f} ms</span>"
+        )
+        bufferbloat = result.bufferbloat
+        if bufferbloat:
+            loaded = ' / '.join(
+                f"{bufferbloat[phase]:.0f}" for phase in ('download', 'upload') if phase in bufferbloat
+            )
+            self.ping_label.setText(
+                f"{self.ping_label.text()}<br><span style='font-size: 11px;'>"
+                f"{TRANSLATIONS[self.language]['loaded']}: {loaded} ms ({bufferbloat['grade']})</span>"
+            )
+
+    def show_steady_state(self):
+        # Yerleşik motor yavaş başlangıç hariç kararlı verimi de raporlar
+        for phase, label in (('download', self.download_label), ('upload', self.upload_label)):
+            result = getattr(self.speed_test_thread.result, phase, None)
+            if result is None or not result.steady_bits_per_second:
+                continue
+            steady = result.steady_bits_per_second / MEGABIT
+            label.setText(
+                f"{label.text()}<br><span style='font-size: 11px;'>"
+                f"{TRANSLATIONS[self.language]['steady']}: {steady:.2f} Mbps | "
+                f"{TRANSLATIONS[self.language]['ramp']}: {result.ramp:.1f} s</span>"
+            )
+
+    def record_result(self):
+        # Yazma, geçmişin kendi iş parçacığında yapılır; arayüz beklemez
+        result = self.speed_test_thread.result
+        if result is None:
+            return
+        import sqlite3
+
+        # Geçmiş ilk kullanımda açılır; dizin ya da veritabanı hatası uygulamayı düşürmemeli
+        try:
+            self.history_store().add(result)
+        except (OSError, sqlite3.Error) as e:
+            self.connection_status_label.setText(f"{TRANSLATIONS[self.language]['history_failed']}: {e}")
+        if self.metrics is not None:
+            self.metrics.update(result)
+
+    def history_store(self):
+        if self.history is None:
+            from runner.history import HistoryStore
+            self.history = HistoryStore()
+        return self.history
+
+    def closeEvent(self, event):
+        # Süren test iptal edilir; iş parçacığı soketleri kapatıp çıkana dek sınırlı süre beklenir
+        if self.speed_test_thread.isRunning():
+            self.speed_test_thread.cancel()
+            if not self.speed_test_thread.wait(CLOSE_TIMEOUT_MS):
+                # Çalışan QThread yok edilemez; pencere gizlenir, kapanış iş parçacığı bitince tamamlanır
+                if not self.isHidden():
+                    self.hide()
+                    self.speed_test_thread.finished.connect(self.close)
+                event.ignore()
+                return
+        self.speed_test_thread.close(CLOSE_TIMEOUT_MS / 1000)
+        if self.history is not None:
+            self.history.close()
+        if self.metrics is not None:
+            self.metrics.close()
+        super().closeEvent(event)
+
     def handle_speed_test_error(self, error_message):
         self.connection_status_label.setText(f"{TRANSLATIONS[self.language]['connection_error']} {error_message}")
+        if self.metrics is not None:
+            self.metrics.record_failure()
         self.start_button.setVisible(True)
+        self.cancel_button.setVisible(False)
         self.progress_bar.setVisible(False)
 
     def show_about_dialog(self):
         about_dialog = AboutDialog(self, self.language)
         about_dialog.exec_()
 
+    def show_history_dialog(self):
+        import sqlite3
+
+        try:
+            store = self.history_store()
+        except (OSError, sqlite3.Error) as e:
+            self.connection_status_label.setText(f"{TRANSLATIONS[self.language]['history_failed']}: {e}")
+            return
+        history_dialog = HistoryDialog(store, self, self.language)
+        history_dialog.exec_()
+
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,5 @@
+__version__ = '1.0'
+
+# Tüm Mbps değerleri (CLI, arayüz, günlük, eşikler) bu birimle hesaplanır;
+# speedtest.net gibi ondalık (SI) megabit
+MEGABIT = 1_000_000
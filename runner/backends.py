@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .engine import DownloadEngine, PhaseResult, UploadEngine
+from .latency import LatencySeries, measure_latency, select_best_server
+from .pool import ConnectionPool
+from .servers import ServerCache
+from .tcp import TCPDownloadEngine, TCPUploadEngine, tcp_endpoint
+
+SERVER_CANDIDATES = 5
+
+
+def server_entry(spec):
+    # Sunucu; speedtest.net sözlüğü, upload.php URL'si ya da host:port olabilir
+    if isinstance(spec, dict):
+        return spec
+    if '://' in spec:
+        return {'url': spec, 'host': urlsplit(spec).netloc, 'name': spec}
+    return {'url': f'http://{spec}/speedtest/upload.php', 'host': spec, 'name': spec}
+
+
+class Backend:
+    # Ölçüm arka ucu: sunucu keşfi, gecikme, indirme ve yükleme.
+    # `servers` verilirse keşif atlanır (ör. yerel bir test sunucusu).
+    # `source_address` verilirse ölçüm bağlantıları o yerel adresten açılır.
+    # `cancel` (pipeline.CancelToken) run_test tarafından her test için atanır.
+
+    name = None
+    # Farklı sunuculara aynı anda ölçüm yapılabilir mi (bkz. fleet.run_fleet)
+    concurrent = True
+
+    def __init__(self, servers=None, candidates=SERVER_CANDIDATES, timeout=10.0, source_address=None,
+                 **engine_options):
+        self.servers = [server_entry(server) for server in servers] if servers else None
+        self.candidates = candidates
+        self.timeout = timeout
+        self.source_address = source_address
+        self.engine_options = engine_options
+        self.cancel = None
+        self.pool = None
+
+    @property
+    def loaded_latency(self):
+        return bool(self.engine_options.get('loaded_latency'))
+
+    @property
+    def stats(self):
+        return self.pool.stats if self.pool is not None else None
+
+    async def open(self):
+        self.pool = ConnectionPool(self.timeout, local_addr=self.source_address)
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def discover(self):
+        if self.servers:
+            return self.servers
+        return await ServerCache(timeout=self.timeout).nearest(self.candidates)
+
+    async def select_server(self, servers):
+        raise NotImplementedError
+
+    async def latency(self, server):
+        raise NotImplementedError
+
+    async def download(self, server, on_sample=None):
+        raise NotImplementedError
+
+    async def upload(self, server, on_sample=None):
+        raise NotImplementedError
+
+
+class _NativeBackend(Backend):
+    download_engine = None
+    upload_engine = None
+
+    def endpoint(self, server):
+        raise NotImplementedError
+
+    def target(self, server):
+        raise NotImplementedError
+
+    async def select_server(self, servers):
+        return await select_best_server(servers, top=self.candidates, pool=self.pool, endpoint=self.endpoint)
+
+    async def latency(self, server):
+        return (await measure_latency(self.endpoint(server), pool=self.pool)).summary()
+
+    async def _run(self, engine_class, server, on_sample):
+        engine = engine_class(
+            self.target(server), timeout=self.timeout, pool=self.pool, on_sample=on_sample, cancel=self.cancel,
+            **self.engine_options
+        )
+        return await engine.run()
+
+    async def download(self, server, on_sample=None):
+        return await self._run(self.download_engine, server, on_sample)
+
+    async def upload(self, server, on_sample=None):
+        return await self._run(self.upload_engine, server, on_sample)
+
+
+class HTTPBackend(_NativeBackend):
+    name = 'http'
+    download_engine = DownloadEngine
+    upload_engine = UploadEngine
+
+    def endpoint(self, server):
+        return server['url']
+
+    def target(self, server):
+        return server['url']
+
+
+class TCPBackend(_NativeBackend):
+    # speedtest.net sunucularının 8080 portundaki ham TCP protokolü
+    name = 'tcp'
+    download_engine = TCPDownloadEngine
+    upload_engine = TCPUploadEngine
+
+    def endpoint(self, server):
+        return tcp_endpoint(server['host'])
+
+    def target(self, server):
+        return server['host']
+
+
+class SpeedtestCliBackend(Backend):
+    # speedtest-cli uyarlaması; engelleyen çağrılar iş parçacığında çalışır.
+    # İstemci tek bir "en iyi" sunucu tuttuğundan ölçümler sıralıdır.
+    # İptal, speedtest-cli'nin shutdown_event'i ile indirici/yükleyici
+    # iş parçacıklarına iletilir; bir sonraki blok okunmadan dururlar.
+    name = 'speedtest'
+    concurrent = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = None
+        self._probed = None
+        self._shutdown = threading.Event()
+
+    async def open(self):
+        import speedtest
+        await super().open()
+        self._client = await asyncio.to_thread(
+            speedtest.Speedtest, timeout=self.timeout, source_address=self.source_address,
+            shutdown_event=self._shutdown
+        )
+
+    async def discover(self):
+        if self.servers:
+            return self.servers
+        return await asyncio.to_thread(self._client.get_closest_servers, self.candidates)
+
+    async def select_server(self, servers):
+        self._probed = await asyncio.to_thread(self._client.get_best_server, servers)
+        return self._probed
+
+    async def latency(self, server):
+        # speedtest-cli yalnızca ortalama gecikmeyi verir. Sunucu bu testte
+        # seçilmediyse (sıcak işçi) seçimdeki değer bayattır; yeniden ölçülür.
+        if server is not self._probed:
+            server = await asyncio.to_thread(self._client.get_best_server, [server])
+        self._probed = None
+        series = LatencySeries()
+        series.add(round(server.get('latency', 0) * 1e6))
+        return series.summary()
+
+    async def _run(self, method, phase):
+        # İstemci ardışık testlerde açık kalabilir; önceki iptal temizlenir
+        self._shutdown.clear()
+        unregister = self.cancel.register(self._shutdown.set) if self.cancel is not None else None
+        started = time.monotonic()
+        try:
+            bits = await asyncio.to_thread(method)
+        finally:
+            if unregister is not None:
+                unregister()
+        elapsed = time.monotonic() - started
+        streams = self._client.config.get('threads', {}).get(phase, 0)
+        return PhaseResult(round(bits * elapsed / 8), elapsed, int(streams), cancelled=self._shutdown.is_set())
+
+    async def download(self, server, on_sample=None):
+        self._client._best = server
+        return await self._run(self._client.download, 'download')
+
+    async def upload(self, server, on_sample=None):
+        self._client._best = server
+        return await self._run(self._client.upload, 'upload')
+
+
+BACKENDS = {
+    'speedtest': SpeedtestCliBackend,
+    'http': HTTPBackend,
+    'native': HTTPBackend,
+    'tcp': TCPBackend,
+}
+
+
+def create_backend(name, **options):
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f'unknown backend {name!r}; choose from {", ".join(sorted(BACKENDS))}') from None
+    return backend_class(**options)
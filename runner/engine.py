@@ -0,0 +1,332 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .http import HTTPConnection, HTTPError, ProtocolError, split_url
+from .latency import LatencySeries, monitor_latency
+from .pool import ConnectionPool, PoolStats
+from .sampling import SAMPLE_INTERVAL, ConvergenceEstimator, SampleSeries, ThroughputSampler, steady_state
+
+DOWNLOAD_SIZES = (2000, 2500, 3000, 3500, 4000)
+UPLOAD_SIZE = 4 * 1024 * 1024
+PAYLOAD_SIZE = 32 * 1024 * 1024
+# Faz bitince akışlar sürmekte olan aktarımı en fazla bu kadar bitirmeye çalışır
+DRAIN_TIMEOUT = 2.0
+
+# Form gövdesinde güvenli 64 karakter; 256 bayt değeri eşit dağılır
+_PAYLOAD_TABLE = bytes(
+    b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'[i % 64] for i in range(256)
+)
+
+
+@dataclass
+class PhaseResult:
+    bytes: int
+    elapsed: float
+    streams: int
+    converged: bool = False
+    samples: SampleSeries = field(default_factory=SampleSeries, repr=False)
+    # Yavaş başlangıç süresi ve sonrasındaki kararlı verim
+    ramp: float = 0.0
+    steady_bits_per_second: float = None
+    # Faz sürerken ölçülen gecikme özeti (ms), `loaded_latency` açıksa
+    loaded_latency: dict = None
+    # Faz iptal edildi; değerler o ana kadar aktarılan veriye dayanır
+    cancelled: bool = False
+    # Bu fazın akışlarının havuzdan aldığı bağlantılar (açılan/yeniden kullanılan)
+    pool: PoolStats = field(default=None, repr=False)
+
+    @property
+    def bits_per_second(self):
+        return self.bytes * 8 / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self, samples=False):
+        record = {
+            'bytes': self.bytes,
+            'elapsed': self.elapsed,
+            'streams': self.streams,
+            'bits_per_second': self.bits_per_second,
+            'converged': self.converged,
+            'ramp': self.ramp,
+            'steady_bits_per_second': self.steady_bits_per_second,
+            'loaded_latency': self.loaded_latency,
+            'cancelled': self.cancelled,
+        }
+        if samples:
+            record['samples'] = [list(sample) for sample in self.samples]
+        return record
+
+
+def download_paths(server_url, sizes=DOWNLOAD_SIZES):
+    # speedtest.net sunucularında indirme dosyaları upload.php ile aynı dizindedir
+    _, _, _, path = split_url(server_url)
+    base = path.split('?', 1)[0].rsplit('/', 1)[0]
+    return [f'{base}/random{size}x{size}.jpg' for size in sizes]
+
+
+@lru_cache(maxsize=1)
+def upload_payload(size=PAYLOAD_SIZE):
+    # Sıkıştırılamayan yük bir kez üretilir, tüm istekler bunun dilimlerini gönderir
+    return memoryview(os.urandom(size).translate(_PAYLOAD_TABLE))
+
+
+class _Upload:
+    # Sürmekte olan tek bir yükleme isteği ve şimdiye dek yazılan gövde baytları
+    __slots__ = ('connection', 'sent')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.sent = 0
+
+    def count(self, nbytes):
+        self.sent += nbytes
+
+    def acknowledged(self):
+        # Çekirdek bilmiyorsa (SIOCOUTQ yok) yarım istek hiç sayılmaz
+        pending = self.connection.unacknowledged()
+        return max(0, self.sent - pending) if pending is not None else 0
+
+
+class TransferEngine:
+    # Akış sayısı her adımda artırılır; verim artışı `plateau` oranının
+    # altına düştüğünde yeni akış açılmaz. `adaptive` açıkken faz, verim
+    # yakınsadığında erken biter; `duration` üst sınır olarak kalır.
+    # `cancel` (pipeline.CancelToken) tetiklenirse faz hemen durur, akışların
+    # soketleri kesilir ve kısmi sonuç döner. Normal bitişte ölçüm durdurulur,
+    # akışlar yarım kalan isteği `drain_timeout` içinde tamamlayıp bağlantıyı
+    # havuza bırakır; sonraki faz (ör. indirmeden sonra yükleme) el sıkışmaz.
+
+    connection_class = HTTPConnection
+
+    def __init__(self, server_url, streams=4, max_streams=32, duration=10.0,
+                 step_interval=1.0, plateau=0.05, timeout=10.0,
+                 sample_interval=SAMPLE_INTERVAL, on_sample=None,
+                 adaptive=False, tolerance=0.05, convergence_window=1.0, min_duration=2.0,
+                 pool=None, loaded_latency=False, local_addr=None, cancel=None, drain_timeout=DRAIN_TIMEOUT):
+        self.host, self.port, self.secure, _ = split_url(server_url)
+        self.server_url = server_url
+        self.streams = max(1, streams)
+        self.max_streams = max(self.streams, max_streams)
+        self.duration = duration
+        self.step_interval = step_interval
+        self.plateau = plateau
+        self.timeout = timeout
+        self.pool = pool
+        self.local_addr = local_addr or (pool.local_addr if pool is not None else None)
+        self.loaded_latency = loaded_latency
+        self.on_sample = on_sample
+        self.sampler = ThroughputSampler(sample_interval, callback=self._on_sample)
+        self.adaptive = adaptive
+        self.tolerance = tolerance
+        self.convergence_window = convergence_window
+        self.min_duration = min_duration
+        self.cancel = cancel
+        self.drain_timeout = drain_timeout
+        self._cancelled = False
+        self._estimator = None
+        self._settled = False
+        self._bytes = 0
+        self._uploads = set()
+        self._pool_stats = PoolStats()
+        self._stop = None
+        self._converged = None
+
+    def _on_sample(self, sample):
+        if self._estimator is not None and self._estimator.update(sample) and self._settled:
+            self._converged.set()
+        if self.on_sample is not None:
+            self.on_sample(sample)
+
+    def _count(self, nbytes):
+        self._bytes += nbytes
+
+    def _total(self):
+        # İndirmede alınan bayt; yüklemede sunucunun aldığı doğrulanan bayt
+        return self._bytes + sum(upload.acknowledged() for upload in self._uploads)
+
+    async def _acknowledged(self, connection, send):
+        # Yükleme baytları yazıldığında değil sunucu aldığında sayılır: istek
+        # sürerken gönderme kuyruğunda bekleyenler düşülür, yanıt gelince gövdenin
+        # tamamı sayılır. Kesilen isteğin onaylanmamış kuyruğu sayılmaz.
+        upload = _Upload(connection)
+        self._uploads.add(upload)
+        try:
+            result = await send(upload.count)
+        finally:
+            self._uploads.discard(upload)
+        self._bytes += upload.sent
+        return result
+
+    def stop(self):
+        # Olay döngüsünden çağrılır; denetim döngüsü bir sonraki adımı beklemeden çıkar
+        self._cancelled = True
+        if self._converged is not None:
+            self._converged.set()
+
+    async def run(self):
+        self._bytes = 0
+        self._uploads.clear()
+        self._pool_stats = PoolStats()
+        self._stop = asyncio.Event()
+        self._converged = asyncio.Event()
+        self._cancelled = False
+        self._settled = False
+        self._estimator = ConvergenceEstimator(
+            self.convergence_window, self.tolerance, self.min_duration, self.sampler.interval
+        ) if self.adaptive else None
+        tasks = []
+        pool = self.pool or ConnectionPool(self.timeout, local_addr=self.local_addr)
+
+        def spawn(count):
+            for _ in range(count):
+                tasks.append(asyncio.create_task(self._stream(len(tasks), pool)))
+
+        start = time.monotonic()
+        deadline = start + self.duration
+        spawn(self.streams)
+        sampling = asyncio.create_task(self.sampler.run(self._total, start))
+        monitor = LatencySeries() if self.loaded_latency else None
+        probing = asyncio.create_task(
+            monitor_latency(self.latency_target, self._stop, timeout=self.timeout, series=monitor,
+                            local_addr=self.local_addr)
+        ) if monitor is not None else None
+
+        growing = True
+        best_rate = 0.0
+        last_bytes, last_time = 0, start
+        unregister = self.cancel.register(self.stop) if self.cancel is not None else None
+        finished = False
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline or self._converged.is_set() or all(task.done() for task in tasks):
+                    break
+                try:
+                    await asyncio.wait_for(self._converged.wait(), min(self.step_interval, deadline - now))
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                now = time.monotonic()
+                current = self._total()
+                rate = (current - last_bytes) / (now - last_time)
+                last_bytes, last_time = current, now
+                if growing and len(tasks) < self.max_streams:
+                    if rate > best_rate * (1 + self.plateau):
+                        best_rate = rate
+                        spawn(min(len(tasks), self.max_streams - len(tasks)))
+                    else:
+                        growing = False
+                self._settled = not growing or len(tasks) >= self.max_streams
+            finished = True
+        finally:
+            total, elapsed = self._total(), time.monotonic() - start
+            if unregister is not None:
+                unregister()
+            self._stop.set()
+            sampling.cancel()
+            helpers = [sampling]
+            if probing is not None:
+                probing.cancel()
+                helpers.append(probing)
+            if finished and not self._cancelled and pool is self.pool and self.drain_timeout:
+                # Bitmeyen akışlar aşağıda kesilir; bitenler bağlantıyı havuza bırakmıştır
+                await asyncio.wait(tasks, timeout=self.drain_timeout)
+            for task in tasks:
+                task.cancel()
+            outcomes = await asyncio.gather(*helpers, *tasks, return_exceptions=True)
+            if pool is not self.pool:
+                pool.close()
+
+        if not total and not self._cancelled:
+            errors = [o for o in outcomes if isinstance(o, Exception) and not isinstance(o, asyncio.CancelledError)]
+            if errors:
+                raise errors[0]
+        samples = self.sampler.samples[:]
+        ramp, steady = steady_state(samples)
+        return PhaseResult(total, elapsed, len(tasks), self._converged.is_set() and not self._cancelled,
+                           samples, ramp, steady, monitor.summary() if monitor is not None else None,
+                           self._cancelled, self._pool_stats)
+
+    async def _stream(self, index, pool):
+        connection = None
+        sequence = 0
+        try:
+            while not self._stop.is_set():
+                if connection is None or not connection.is_open:
+                    connection = await pool.acquire(self.host, self.port, self.secure, self.connection_class,
+                                                    self._pool_stats)
+                stale = connection.requests > 0 and sequence == 0
+                try:
+                    await self._transfer(connection, index, sequence)
+                except (ProtocolError, ConnectionError):
+                    # Havuzdan gelen bağlantıyı sunucu bu arada kapatmış olabilir
+                    if not stale:
+                        raise
+                    connection.close()
+                    continue
+                sequence += 1
+        except BaseException:
+            # Yarım kalan aktarımın tamponu beklenmez; soket hemen kesilir
+            if connection is not None:
+                connection.abort()
+            raise
+        if connection is not None:
+            pool.release(connection)
+
+    @property
+    def latency_target(self):
+        # Yük altındaki gecikme yoklamasının hedefi (bkz. latency.resolve_endpoint)
+        return self.server_url
+
+    async def _transfer(self, connection, index, sequence):
+        raise NotImplementedError
+
+
+def check_response(response):
+    if response.status != 200:
+        raise HTTPError(f'unexpected HTTP status {response.status}')
+    return response
+
+
+def payload_slice(payload, size, index, sequence):
+    # Her istek yükün farklı bir dilimini gönderir; yeni tampon ayrılmaz
+    span = len(payload) - size + 1
+    offset = (index * 7919 * 1024 + sequence * size) % span
+    return payload[offset:offset + size]
+
+
+class DownloadEngine(TransferEngine):
+    def __init__(self, server_url, sizes=DOWNLOAD_SIZES, **kwargs):
+        super().__init__(server_url, **kwargs)
+        self.paths = download_paths(server_url, sizes)
+
+    async def _transfer(self, connection, index, sequence):
+        path = self.paths[(index + sequence) % len(self.paths)]
+        check_response(await connection.request(
+            'GET', f'{path}?x={time.time_ns()}.{index}',
+            headers={'Cache-Control': 'no-cache'},
+            on_data=self._count, collect=False
+        ))
+
+
+class UploadEngine(TransferEngine):
+    def __init__(self, server_url, size=UPLOAD_SIZE, payload=None, **kwargs):
+        super().__init__(server_url, **kwargs)
+        _, _, _, self.path = split_url(server_url)
+        self.payload = payload if payload is not None else upload_payload(max(PAYLOAD_SIZE, 2 * size))
+        self.size = min(size, len(self.payload))
+        self._headers = {
+            'Cache-Control': 'no-cache',
+            'Content-Type': 'application/x-www-form-urlencoded',
+        }
+
+    async def _transfer(self, connection, index, sequence):
+        body = (b'content1=', payload_slice(self.payload, self.size, index, sequence))
+
+        async def send(on_sent):
+            return check_response(await connection.request(
+                'POST', self.path, headers=self._headers, body=body, on_sent=on_sent, collect=True
+            ))
+        await self._acknowledged(connection, send)
@@ -0,0 +1,183 @@
+import csv
+import json
+import math
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+
+from .history import COLUMNS
+
+FORMATS = ('csv', 'jsonl', 'columnar')
+EXTENSIONS = {'csv': '.csv', 'jsonl': '.jsonl', 'columnar': '.rcol'}
+EXPORT_COLUMNS = ('id', *COLUMNS)
+BLOCK_SIZE = 4096
+
+# Sütun türleri: 'q' tamsayı, 'd' ondalık (NULL = NaN), 's' metin
+COLUMN_TYPES = {
+    'id': 'q', 'timestamp': 'd', 'ping': 'd', 'jitter': 'd', 'download': 'd', 'upload': 'd',
+    'download_steady': 'd', 'upload_steady': 'd',
+}
+
+# Sütunlu biçim (küçük sonlu):
+#   b'RCOL' u8 sürüm, u32 uzunluk + JSON şema {"columns": [[ad, tür], ...]}
+#   bloklar: u32 satır sayısı (0 = son), ardından her sütun için
+#     'q'/'d': u32 uzunluk + ham dizi baytları
+#     's'    : u32 uzunluk + JSON sözlük listesi, u32 uzunluk + array('i') kodlar (-1 = NULL)
+COLUMNAR_MAGIC = b'RCOL'
+COLUMNAR_VERSION = 1
+_U32 = struct.Struct('<I')
+_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60, 'w': 7 * 24 * 60 * 60}
+
+
+def parse_time(value, now=None):
+    # Unix zamanı, ISO tarih/saat ya da "7d", "12h" gibi şimdiden geriye süre
+    value = value.strip()
+    unit = _UNITS.get(value[-1:].lower())
+    if unit and value[:-1].replace('.', '', 1).isdigit():
+        return (now if now is not None else time.time()) - float(value[:-1]) * unit
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f'invalid time {value!r}; use a Unix time, an ISO date or a duration like 7d') from None
+
+
+def _little_endian(column):
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _rows(chunks):
+    for rows in chunks:
+        yield from rows
+
+
+def write_csv(chunks, f, columns):
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    count = 0
+    for rows in chunks:
+        writer.writerows(tuple(row) for row in rows)
+        count += len(rows)
+    return count
+
+
+def write_jsonl(chunks, f, columns):
+    count = 0
+    for row in _rows(chunks):
+        record = dict(zip(columns, row))
+        if record.get('metadata'):
+            record['metadata'] = json.loads(record['metadata'])
+        f.write(json.dumps(record, separators=(',', ':')))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def _write_block(f, columns, types, block):
+    f.write(_U32.pack(len(block)))
+    for index, name in enumerate(columns):
+        values = [row[index] for row in block]
+        kind = types[name]
+        if kind == 's':
+            dictionary, codes = {}, array('i')
+            for value in values:
+                codes.append(-1 if value is None else dictionary.setdefault(value, len(dictionary)))
+            encoded = json.dumps(list(dictionary), separators=(',', ':')).encode()
+            f.write(_U32.pack(len(encoded)) + encoded)
+            data = _little_endian(codes)
+        elif kind == 'd':
+            data = _little_endian(array('d', (math.nan if value is None else value for value in values)))
+        else:
+            data = _little_endian(array('q', (value or 0 for value in values)))
+        f.write(_U32.pack(len(data)) + data)
+
+
+def write_columnar(chunks, f, columns, block_size=BLOCK_SIZE):
+    types = {name: COLUMN_TYPES.get(name, 's') for name in columns}
+    schema = json.dumps({'columns': [[name, types[name]] for name in columns]}).encode()
+    f.write(COLUMNAR_MAGIC + bytes([COLUMNAR_VERSION]) + _U32.pack(len(schema)) + schema)
+    block, count = [], 0
+    for row in _rows(chunks):
+        block.append(row)
+        if len(block) == block_size:
+            _write_block(f, columns, types, block)
+            count += len(block)
+            block = []
+    if block:
+        _write_block(f, columns, types, block)
+        count += len(block)
+    f.write(_U32.pack(0))
+    return count
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError('truncated columnar file')
+    return data
+
+
+def read_columnar(f):
+    # Blok blok {sütun: değer listesi} döner
+    if _read_exact(f, 4) != COLUMNAR_MAGIC:
+        raise ValueError('not a Runner columnar file')
+    version = _read_exact(f, 1)[0]
+    if version != COLUMNAR_VERSION:
+        raise ValueError(f'unsupported columnar version {version}')
+    (size,) = _U32.unpack(_read_exact(f, 4))
+    columns = json.loads(_read_exact(f, size))['columns']
+    while True:
+        (count,) = _U32.unpack(_read_exact(f, 4))
+        if not count:
+            return
+        block = {}
+        for name, kind in columns:
+            dictionary = None
+            if kind == 's':
+                (size,) = _U32.unpack(_read_exact(f, 4))
+                dictionary = json.loads(_read_exact(f, size))
+            (size,) = _U32.unpack(_read_exact(f, 4))
+            values = array('i' if kind == 's' else kind)
+            values.frombytes(_read_exact(f, size))
+            if sys.byteorder == 'big':
+                values.byteswap()
+            if dictionary is not None:
+                block[name] = [None if code < 0 else dictionary[code] for code in values]
+            elif kind == 'd':
+                block[name] = [None if math.isnan(value) else value for value in values]
+            else:
+                block[name] = values.tolist()
+        yield block
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'columnar': write_columnar}
+
+
+def export_history(store, destination, fmt='csv', since=None, until=None, server=None, columns=None):
+    # Geçmişi akış halinde yazar; `destination` dosya yolu, '-' (stdout) ya
+    # da açık bir dosya nesnesi olabilir. Yazılan satır sayısı döner.
+    if fmt not in WRITERS:
+        raise ValueError(f'unknown export format {fmt!r}; choose from {", ".join(FORMATS)}')
+    columns = tuple(columns or EXPORT_COLUMNS)
+    chunks = store.chunks(since=since, until=until, server=server, columns=columns)
+    binary = fmt == 'columnar'
+    if destination == '-':
+        f = sys.stdout.buffer if binary else sys.stdout
+        count = WRITERS[fmt](chunks, f, columns)
+        f.flush()
+        return count
+    if not isinstance(destination, str):
+        return WRITERS[fmt](chunks, destination, columns)
+    if binary:
+        with open(destination, 'wb') as f:
+            return WRITERS[fmt](chunks, f, columns)
+    with open(destination, 'w', newline='', encoding='utf-8') as f:
+        return WRITERS[fmt](chunks, f, columns)
@@ -0,0 +1,160 @@
+import asyncio
+import statistics
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+
+from .pipeline import MeasurementResult, grade_bufferbloat
+from .pool import PoolStats
+
+
+@dataclass
+class FleetTarget:
+    server: dict
+    latency: dict = None
+    result: MeasurementResult = None
+    error: str = None
+    # Uplink testlerinde ölçümün bağlandığı yerel adres
+    source: str = None
+
+    @property
+    def label(self):
+        return self.source or (self.server or {}).get('host')
+
+    def as_dict(self, samples=False):
+        if self.result is not None:
+            return {'source': self.source, **self.result.as_dict(samples), 'error': None}
+        server = {key: self.server[key] for key in ('id', 'name', 'sponsor', 'host', 'url')
+                  if key in (self.server or {})}
+        return {'source': self.source, 'server': server, 'latency': self.latency, 'error': self.error}
+
+
+@dataclass
+class FleetReport:
+    backend: str
+    targets: list
+    started: float
+    finished: float = field(default_factory=time.time)
+
+    @property
+    def results(self):
+        return [target.result for target in self.targets if target.result is not None]
+
+    def summary(self):
+        # Hedefler arası özet: başarılı/başarısız sayısı, medyanlar, en iyi hedefler
+        measured = [target for target in self.targets if target.result is not None]
+        summary = {'targets': len(self.targets), 'succeeded': len(measured),
+                   'failed': len(self.targets) - len(measured)}
+        if measured:
+            for phase in ('download', 'upload'):
+                def rate(target):
+                    return getattr(target.result, phase).bits_per_second
+                summary[f'{phase}_median'] = statistics.median(rate(target) for target in measured)
+                summary[f'{phase}_best'] = max(measured, key=rate).label
+            summary['ping_median'] = statistics.median(target.result.ping for target in measured)
+            summary['ping_best'] = min(measured, key=lambda target: target.result.ping).label
+        return summary
+
+    def as_dict(self, samples=False):
+        return {
+            'backend': self.backend,
+            'started': self.started,
+            'finished': self.finished,
+            'summary': self.summary(),
+            'targets': [target.as_dict(samples) for target in self.targets],
+        }
+
+
+async def _bandwidth(backend, target, on_sample=None):
+    def sampler(phase):
+        if on_sample is None:
+            return None
+        return lambda sample: on_sample(target.label, phase, sample)
+
+    try:
+        download = await backend.download(target.server, sampler('download'))
+        upload = await backend.upload(target.server, sampler('upload'))
+    except Exception as e:
+        target.error = str(e) or type(e).__name__
+        return
+    bufferbloat = grade_bufferbloat(target.latency, download, upload) if backend.loaded_latency else None
+    # Havuz paralel hedeflerce paylaşılır; hedefin payı kendi fazlarının sayaçlarıdır
+    stats = PoolStats()
+    for phase in (download, upload):
+        if phase.pool is not None:
+            stats = stats.plus(phase.pool)
+    target.result = MeasurementResult(backend.name, target.server, target.latency,
+                                      download, upload, bufferbloat, stats)
+
+
+async def run_fleet(backend, parallel=1, progress=None, on_sample=None):
+    # Tüm hedeflerde gecikme eşzamanlı ölçülür; bant genişliği testleri
+    # verilen sırayla, aynı anda en fazla `parallel` hedefte çalışır.
+    # Bir hedefteki hata diğerlerini durdurmaz. progress(biten, toplam),
+    # on_sample(hedef, faz, örnek)
+    progress = progress or (lambda done, total: None)
+    started = time.time()
+
+    async with backend:
+        servers = await backend.discover()
+        targets = [FleetTarget(server) for server in servers]
+
+        async def probe(target):
+            try:
+                if not backend.concurrent:
+                    target.server = await backend.select_server([target.server])
+                target.latency = await backend.latency(target.server)
+            except Exception as e:
+                target.error = str(e) or type(e).__name__
+
+        if backend.concurrent:
+            await asyncio.gather(*(probe(target) for target in targets))
+        else:
+            for target in targets:
+                await probe(target)
+
+        limit = asyncio.Semaphore(max(1, parallel if backend.concurrent else 1))
+        done = 0
+
+        async def measure(target):
+            nonlocal done
+            if target.error is None:
+                async with limit:
+                    await _bandwidth(backend, target, on_sample)
+            done += 1
+            progress(done, len(targets))
+
+        await asyncio.gather(*(measure(target) for target in targets))
+        return FleetReport(backend.name, targets, started)
+
+
+async def run_uplinks(backend_factory, sources, progress=None, on_sample=None):
+    # Her kaynak adres (uplink) için ayrı bir arka uç: sunucu seçimi ve
+    # gecikme tüm uplink'lerde eşzamanlı, bant genişliği fazları sırayla
+    # ölçülür; uplink'ler birbirinin trafiğinden etkilenmez.
+    # backend_factory(kaynak adres) -> Backend
+    progress = progress or (lambda done, total: None)
+    started = time.time()
+    backends = [backend_factory(source) for source in sources]
+    targets = [FleetTarget(None, source=source) for source in sources]
+
+    async with AsyncExitStack() as stack:
+        for backend in backends:
+            await stack.enter_async_context(backend)
+        # Aday listesi bir kez alınır; her uplink kendi en iyi sunucusunu seçer
+        servers = await backends[0].discover()
+
+        async def probe(backend, target):
+            try:
+                target.server = await backend.select_server(servers)
+                target.latency = await backend.latency(target.server)
+            except Exception as e:
+                target.error = str(e) or type(e).__name__
+
+        await asyncio.gather(*(probe(backend, target) for backend, target in zip(backends, targets)))
+
+        for done, (backend, target) in enumerate(zip(backends, targets), 1):
+            if target.error is None:
+                await _bandwidth(backend, target, on_sample)
+            progress(done, len(targets))
+        return FleetReport(backends[0].name, targets, started)
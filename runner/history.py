@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+SCHEMA_VERSION = 1
+RETENTION_DAYS = 365
+BATCH_SIZE = 64
+PRUNE_INTERVAL = 60 * 60
+CHUNK_SIZE = 1000
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    backend TEXT,
+    server_id TEXT,
+    server_name TEXT,
+    server_host TEXT,
+    ping REAL,
+    jitter REAL,
+    download REAL,
+    upload REAL,
+    download_steady REAL,
+    upload_steady REAL,
+    bufferbloat TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp);
+CREATE INDEX IF NOT EXISTS results_server ON results (server_host, timestamp);
+'''
+
+COLUMNS = (
+    'timestamp', 'backend', 'server_id', 'server_name', 'server_host', 'ping', 'jitter',
+    'download', 'upload', 'download_steady', 'upload_steady', 'bufferbloat', 'metadata',
+)
+_INSERT = f'INSERT INTO results ({", ".join(COLUMNS)}) VALUES ({", ".join("?" * len(COLUMNS))})'
+_STOP = object()
+
+
+def data_dir():
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'runner')
+
+
+def result_row(result):
+    # Hız değerleri bit/s; faz ayrıntıları JSON olarak `metadata` sütununda
+    record = result.as_dict()
+    server = record['server']
+    phases = {phase: record[phase] for phase in ('download', 'upload')}
+    metadata = {'latency': record['latency'], 'pool': record['pool'], **phases}
+    return (
+        result.timestamp,
+        result.backend,
+        str(server.get('id', '')) or None,
+        server.get('sponsor') or server.get('name'),
+        server.get('host'),
+        result.ping,
+        result.latency.get('jitter'),
+        phases['download']['bits_per_second'],
+        phases['upload']['bits_per_second'],
+        phases['download']['steady_bits_per_second'],
+        phases['upload']['steady_bits_per_second'],
+        result.bufferbloat['grade'] if result.bufferbloat else None,
+        json.dumps(metadata, separators=(',', ':')),
+    )
+
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=30.0)
+    connection.row_factory = sqlite3.Row
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class HistoryStore:
+    # Ölçüm geçmişi. Yazma işleri kuyruğa alınır ve tek bir yazıcı iş
+    # parçacığı tarafından toplu olarak eklenir; ölçüm iş parçacığı beklemez.
+    # WAL kipinde okuyucular yazıcıyı engellemez. `retention_days` günden
+    # eski kayıtlar saatte bir silinir.
+
+    def __init__(self, path=None, retention_days=RETENTION_DAYS, batch_size=BATCH_SIZE):
+        self.path = path or os.path.join(data_dir(), 'history.sqlite3')
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with connect(self.path) as connection:
+            if connection.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                connection.executescript(_SCHEMA)
+                connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        connection.close()
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='runner-history', daemon=True)
+        self._writer.start()
+
+    def add(self, result):
+        self._queue.put(result_row(result))
+
+    def flush(self):
+        # Kuyruktaki tüm kayıtlar yazılana kadar bekle
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_loop(self):
+        connection = connect(self.path)
+        pruned = 0.0
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                rows = [row for row in batch if row is not _STOP]
+                try:
+                    if rows:
+                        with connection:
+                            connection.executemany(_INSERT, rows)
+                    if self.retention_days and time.monotonic() - pruned > PRUNE_INTERVAL:
+                        self._prune(connection, time.time() - self.retention_days * 24 * 60 * 60)
+                        pruned = time.monotonic()
+                except sqlite3.Error as e:
+                    log.warning('history write failed: %s', e)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if len(rows) != len(batch):
+                    return
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _prune(connection, before):
+        with connection:
+            return connection.execute('DELETE FROM results WHERE timestamp < ?', (before,)).rowcount
+
+    def _reader(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = connect(self.path)
+        return connection
+
+    def prune(self, before):
+        return self._prune(self._reader(), before)
+
+    def chunks(self, since=None, until=None, server=None, limit=None, newest_first=False,
+               columns=None, size=CHUNK_SIZE):
+        # Koşullar SQL'e aktarılır (zaman ve sunucu indeksleri kullanılır);
+        # satırlar imleçten `size` satırlık parçalar halinde okunur, tamamı
+        # belleğe alınmaz. `server` tek bir adres ya da adres listesi olabilir.
+        if columns is not None:
+            unknown = set(columns) - {'id', *COLUMNS}
+            if unknown:
+                raise ValueError(f'unknown history columns: {", ".join(sorted(unknown))}')
+        clauses, params = [], []
+        if since is not None:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('timestamp < ?')
+            params.append(until)
+        if server is not None:
+            servers = [server] if isinstance(server, str) else list(server)
+            clauses.append(f'server_host IN ({", ".join("?" * len(servers))})')
+            params.extend(servers)
+        sql = f'SELECT {", ".join(columns) if columns else "*"} FROM results'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY timestamp' + (' DESC' if newest_first else '')
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        cursor = self._reader().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    def query(self, **filters):
+        for rows in self.chunks(**filters):
+            for row in rows:
+                yield dict(row)
+
+    def count(self):
+        return self._reader().execute('SELECT COUNT(*) FROM results').fetchone()[0]
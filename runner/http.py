@@ -0,0 +1,374 @@
+import asyncio
+import ssl
+import struct
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import fcntl
+    import termios
+    # Linux'ta TCP soketi için SIOCOUTQ: yazılmış ama karşı tarafça onaylanmamış bayt
+    _OUTQ = termios.TIOCOUTQ
+except (ImportError, AttributeError):
+    fcntl = None
+
+from . import __version__
+
+USER_AGENT = f'Runner/{__version__}'
+READ_BUFFER_SIZE = 256 * 1024
+WRITE_CHUNK_SIZE = 256 * 1024
+MAX_HEADER_SIZE = 64 * 1024
+
+# Yanıt ayrıştırıcısının durumları
+_IDLE, _HEAD, _LENGTH, _CHUNK_SIZE, _CHUNK_DATA, _CHUNK_END, _TRAILER, _UNTIL_CLOSE = range(8)
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class HTTPError(ProtocolError):
+    pass
+
+
+def unacknowledged(transport):
+    # Aktarımın ve çekirdeğin gönderme kuyruğunda bekleyen bayt; bilinemiyorsa None
+    if transport is None or fcntl is None:
+        return None
+    sock = transport.get_extra_info('socket')
+    if sock is None:
+        return None
+    try:
+        queued = struct.unpack('i', fcntl.ioctl(sock.fileno(), _OUTQ, b'\0\0\0\0'))[0]
+    except (OSError, ValueError):
+        return None
+    return transport.get_write_buffer_size() + queued
+
+
+def split_url(url):
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    return parts.hostname, port, secure, path
+
+
+class Response:
+    __slots__ = ('status', 'headers', 'body', 'nbytes', 'keep_alive')
+
+    def __init__(self, status, headers, keep_alive):
+        self.status = status
+        self.headers = headers
+        self.body = b''
+        self.nbytes = 0
+        self.keep_alive = keep_alive
+
+
+class _HTTPProtocol(asyncio.BufferedProtocol):
+    # Gelen veri her bağlantı için tek bir önceden ayrılmış tampona okunur;
+    # gövde baytları kopyalanmadan yalnızca sayılır.
+
+    def __init__(self, loop, bufsize):
+        self._loop = loop
+        self._buffer = memoryview(bytearray(bufsize))
+        self._pending = bytearray()
+        self._state = _IDLE
+        self._method = None
+        self._remaining = 0
+        self._on_data = None
+        self._body = None
+        self._response = None
+        self._waiter = None
+        self._paused = False
+        self._drain_waiter = None
+        self.transport = None
+        self.closed = False
+
+    def start(self, method, collect, on_data):
+        if self._state != _IDLE:
+            raise HTTPError('connection is busy')
+        self._state = _HEAD
+        self._method = method
+        self._on_data = on_data
+        self._body = bytearray() if collect else None
+        self._response = None
+        self._waiter = self._loop.create_future()
+        return self._waiter
+
+    @property
+    def idle(self):
+        return self._state == _IDLE
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self._buffer
+
+    def buffer_updated(self, nbytes):
+        try:
+            self._feed(self._buffer[:nbytes])
+        except (HTTPError, ValueError) as exc:
+            self._fail(exc if isinstance(exc, HTTPError) else HTTPError(str(exc)))
+            self.transport.close()
+
+    def eof_received(self):
+        if self._state == _UNTIL_CLOSE:
+            self._finish()
+        elif self._state != _IDLE:
+            self._fail(HTTPError('connection closed before response completed'))
+        return False
+
+    def connection_lost(self, exc):
+        self.closed = True
+        if self._state != _IDLE:
+            self._fail(exc or HTTPError('connection lost'))
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_exception(exc or ConnectionResetError('connection lost'))
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    async def drain(self):
+        if self.closed:
+            raise ConnectionResetError('connection lost')
+        if not self._paused:
+            return
+        self._drain_waiter = self._loop.create_future()
+        try:
+            await self._drain_waiter
+        finally:
+            self._drain_waiter = None
+
+    def _consume(self, data):
+        n = len(data)
+        self._response.nbytes += n
+        if self._body is not None:
+            self._body += data
+        if self._on_data is not None:
+            self._on_data(n)
+
+    def _feed(self, data):
+        while len(data):
+            state = self._state
+            if state == _LENGTH or state == _CHUNK_DATA:
+                n = min(self._remaining, len(data))
+                self._consume(data[:n])
+                data = data[n:]
+                self._remaining -= n
+                if not self._remaining:
+                    if state == _LENGTH:
+                        self._finish()
+                    else:
+                        self._state = _CHUNK_END
+                        self._remaining = 2
+            elif state == _CHUNK_END:
+                n = min(self._remaining, len(data))
+                data = data[n:]
+                self._remaining -= n
+                if not self._remaining:
+                    self._state = _CHUNK_SIZE
+            elif state == _UNTIL_CLOSE:
+                self._consume(data)
+                return
+            elif state == _IDLE:
+                return
+            else:
+                # Satır tabanlı durumlar: başlık bloğu, chunk boyu ve trailer
+                marker = b'\r\n\r\n' if state == _HEAD else b'\r\n'
+                start = max(0, len(self._pending) - len(marker) + 1)
+                self._pending += data
+                end = self._pending.find(marker, start)
+                if end < 0:
+                    if len(self._pending) > MAX_HEADER_SIZE:
+                        raise HTTPError('response header too large')
+                    return
+                line = bytes(self._pending[:end])
+                rest = len(self._pending) - end - len(marker)
+                data = data[len(data) - rest:]
+                self._pending.clear()
+                self._on_line(line)
+
+    def _on_line(self, line):
+        if self._state == _CHUNK_SIZE:
+            size = int(line.split(b';', 1)[0], 16)
+            if size:
+                self._state = _CHUNK_DATA
+                self._remaining = size
+            else:
+                self._state = _TRAILER
+            return
+        if self._state == _TRAILER:
+            if not line:
+                self._finish()
+            return
+
+        lines = line.decode('latin-1').split('\r\n')
+        version, _, rest = lines[0].partition(' ')
+        try:
+            status = int(rest[:3])
+        except ValueError:
+            raise HTTPError(f'malformed status line: {lines[0]!r}') from None
+        if 100 <= status < 200:
+            return
+        headers = {}
+        for header in lines[1:]:
+            name, _, value = header.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        self._response = Response(status, headers, keep_alive)
+        if self._method == 'HEAD' or status in (204, 304):
+            self._finish()
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            self._state = _CHUNK_SIZE
+        elif 'content-length' in headers:
+            self._remaining = int(headers['content-length'])
+            if self._remaining:
+                self._state = _LENGTH
+            else:
+                self._finish()
+        else:
+            self._response.keep_alive = False
+            self._state = _UNTIL_CLOSE
+
+    def _finish(self):
+        response = self._response
+        if self._body is not None:
+            response.body = bytes(self._body)
+        self._state = _IDLE
+        self._body = None
+        self._on_data = None
+        if not self._waiter.done():
+            self._waiter.set_result(response)
+
+    def _fail(self, exc):
+        self._state = _IDLE
+        self._body = None
+        self._on_data = None
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(exc)
+
+
+class HTTPConnection:
+    def __init__(self, host, port, secure=False, bufsize=READ_BUFFER_SIZE, local_addr=None, address=None):
+        self.host = host
+        self.port = port
+        self.secure = secure
+        self.bufsize = bufsize
+        # Kaynak adres: bağlantı bu yerel adrese (ve onun arayüzüne) bağlanır
+        self.local_addr = local_addr
+        # Önceden çözülmüş adres (bkz. ConnectionPool.resolve); yoksa host çözülür
+        self.address = address
+        self.requests = 0
+        self._transport = None
+        self._protocol = None
+        default_port = 443 if secure else 80
+        self._host_header = host if port == default_port else f'{host}:{port}'
+
+    @property
+    def is_open(self):
+        return self._protocol is not None and not self._protocol.closed
+
+    @property
+    def is_idle(self):
+        return self.is_open and self._protocol.idle
+
+    async def connect(self, timeout=None):
+        loop = asyncio.get_running_loop()
+        context = ssl.create_default_context() if self.secure else None
+        self._transport, self._protocol = await asyncio.wait_for(
+            loop.create_connection(
+                lambda: _HTTPProtocol(loop, self.bufsize),
+                self.address or self.host, self.port, ssl=context,
+                server_hostname=self.host if context is not None else None,
+                local_addr=(self.local_addr, 0) if self.local_addr else None
+            ),
+            timeout
+        )
+
+    async def request(self, method, path, headers=None, body=None, on_data=None, on_sent=None,
+                      collect=True):
+        # body: None, tek bir bytes benzeri nesne ya da bunların listesi
+        parts = () if body is None else (body,) if isinstance(body, (bytes, bytearray, memoryview)) else body
+        length = sum(len(part) for part in parts)
+
+        head = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self._host_header}',
+            f'User-Agent: {USER_AGENT}',
+            'Accept: */*',
+            'Connection: keep-alive',
+        ]
+        for name, value in (headers or {}).items():
+            head.append(f'{name}: {value}')
+        if body is not None:
+            head.append(f'Content-Length: {length}')
+        head.append('\r\n')
+
+        protocol = self._protocol
+        waiter = protocol.start(method, collect, on_data)
+        try:
+            self._transport.write('\r\n'.join(head).encode('latin-1'))
+            for part in parts:
+                view = memoryview(part)
+                for offset in range(0, len(view), WRITE_CHUNK_SIZE):
+                    chunk = view[offset:offset + WRITE_CHUNK_SIZE]
+                    self._transport.write(chunk)
+                    # Aktarıma verilen bayt; onaylanmayanlar unacknowledged() ile bilinir
+                    if on_sent is not None:
+                        on_sent(len(chunk))
+                    await protocol.drain()
+            response = await waiter
+        except BaseException:
+            if not waiter.done():
+                waiter.cancel()
+            elif not waiter.cancelled():
+                waiter.exception()
+            self.abort()
+            raise
+        self.requests += 1
+        if not response.keep_alive:
+            self.close()
+        return response
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+        if self._protocol is not None:
+            self._protocol.closed = True
+
+    def unacknowledged(self):
+        return unacknowledged(self._transport)
+
+    def abort(self):
+        # Yazma tamponundaki veri gönderilmeden bağlantı kesilir (iptal, hata)
+        if self._transport is not None:
+            self._transport.abort()
+        if self._protocol is not None:
+            self._protocol.closed = True
+
+
+async def fetch(url, timeout=10.0, headers=None, redirects=3):
+    # Küçük belgeler (yapılandırma, sunucu listesi) için tek seferlik GET
+    for _ in range(redirects + 1):
+        host, port, secure, path = split_url(url)
+        connection = HTTPConnection(host, port, secure, bufsize=64 * 1024)
+        try:
+            await connection.connect(timeout)
+            response = await asyncio.wait_for(connection.request('GET', path, headers=headers), timeout)
+        finally:
+            connection.close()
+        if response.status in (301, 302, 303, 307, 308) and 'location' in response.headers:
+            url = urljoin(url, response.headers['location'])
+            continue
+        if response.status != 200:
+            raise HTTPError(f'unexpected HTTP status {response.status} for {url}')
+        return response.body
+    raise HTTPError(f'too many redirects for {url}')
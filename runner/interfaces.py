@@ -0,0 +1,85 @@
+import ipaddress
+import socket
+import struct
+import sys
+from collections import namedtuple
+
+# Yerel arayüz adresi; ölçümler `address` kaynak adresine bağlanarak yapılır
+Interface = namedtuple('Interface', 'name address family')
+
+SIOCGIFADDR = 0x8915
+
+
+def _ipv4_address(name):
+    # Linux: arayüzün IPv4 adresi (SIOCGIFADDR)
+    import fcntl
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            packed = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, struct.pack('256s', name.encode()[:15]))
+        except OSError:
+            return None
+    return socket.inet_ntoa(packed[20:24])
+
+
+def _ipv6_addresses():
+    # Linux: /proc/net/if_inet6 -> {arayüz: [adres, ...]}
+    addresses = {}
+    try:
+        with open('/proc/net/if_inet6') as f:
+            for line in f:
+                fields = line.split()
+                address = ipaddress.IPv6Address(bytes.fromhex(fields[0]))
+                addresses.setdefault(fields[5], []).append(str(address))
+    except OSError:
+        pass
+    return addresses
+
+
+def _usable(address):
+    address = ipaddress.ip_address(address)
+    return not (address.is_loopback or address.is_link_local or address.is_unspecified)
+
+
+def local_interfaces(include_ipv6=True, include_loopback=False):
+    # Arayüzler ve adresleri. Linux dışında arayüz adı bilinmez; makine adının
+    # çözüldüğü adresler döner.
+    interfaces = []
+    if sys.platform.startswith('linux'):
+        ipv6 = _ipv6_addresses() if include_ipv6 else {}
+        for _, name in socket.if_nameindex():
+            address = _ipv4_address(name)
+            candidates = ([(address, socket.AF_INET)] if address else []) + \
+                [(address, socket.AF_INET6) for address in ipv6.get(name, ())]
+            for address, family in candidates:
+                if include_loopback or _usable(address):
+                    interfaces.append(Interface(name, address, family))
+        return interfaces
+
+    families = (socket.AF_INET, socket.AF_INET6) if include_ipv6 else (socket.AF_INET,)
+    seen = set()
+    for family in families:
+        try:
+            infos = socket.getaddrinfo(socket.gethostname(), None, family)
+        except socket.gaierror:
+            continue
+        for _, _, _, _, sockaddr in infos:
+            address = sockaddr[0]
+            if address not in seen and (include_loopback or _usable(address)):
+                seen.add(address)
+                interfaces.append(Interface(None, address, family))
+    return interfaces
+
+
+def resolve_source(source):
+    # Kaynak, bir IP adresi ya da arayüz adı olabilir (ör. "eth1")
+    try:
+        ipaddress.ip_address(source)
+        return source
+    except ValueError:
+        pass
+    matches = [interface for interface in local_interfaces(include_loopback=True) if interface.name == source]
+    if not matches:
+        raise ValueError(f'no address found for interface {source!r}')
+    # Arayüzün IPv4 adresi tercih edilir
+    return min(matches, key=lambda interface: interface.family != socket.AF_INET).address
@@ -0,0 +1,221 @@
+import asyncio
+import statistics
+import time
+from collections import namedtuple
+from functools import partial
+
+from .http import HTTPConnection, HTTPError, split_url
+from .pool import ConnectionPool
+from .sampling import SampleSeries
+from .stats import P2Quantile, RunningStats
+
+PROBE_SAMPLES = 3
+PROBE_TIMEOUT = 2.0
+LATENCY_SAMPLES = 20
+LATENCY_INTERVAL = 0.02
+LOADED_INTERVAL = 0.1
+BUFFERBLOAT_GRADES = ((5, 'A+'), (30, 'A'), (60, 'B'), (200, 'C'), (400, 'D'))
+
+
+# Gecikme ölçülecek uç: bağlantı türü, adres ve tek bir RTT ölçen eşyordam
+# ping(connection, sequence, timeout) -> (başlangıç ns, rtt ns)
+Endpoint = namedtuple('Endpoint', 'factory host port secure ping')
+
+# perf_counter_ns zaman damgası ve RTT, ns
+RTTSample = namedtuple('RTTSample', 'timestamp rtt')
+
+
+def latency_path(server_url):
+    _, _, _, path = split_url(server_url)
+    return path.split('?', 1)[0].rsplit('/', 1)[0] + '/latency.txt'
+
+
+def http_endpoint(server_url):
+    host, port, secure, _ = split_url(server_url)
+    return Endpoint(HTTPConnection, host, port, secure, partial(_latency_request, path=latency_path(server_url)))
+
+
+def resolve_endpoint(target):
+    return http_endpoint(target) if isinstance(target, str) else target
+
+
+class LatencySeries:
+    # Zaman damgalı RTT örnekleri (ns). Son örnekler sınırlı bir halkada
+    # tutulur; dağılım istatistikleri akış halinde hesaplanır. Yüzdelikler
+    # halka taşana dek örneklerden kesin hesaplanır; P² az örnekte (ör. 20)
+    # kuyruğu güvenilir kestiremez.
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, capacity=1024):
+        self.samples = SampleSeries(RTTSample, 'qq', capacity)
+        self.stats = RunningStats()
+        self.quantiles = {p: P2Quantile(p) for p in self.QUANTILES}
+        self._jitter = RunningStats()
+        self._last = None
+
+    def __len__(self):
+        return self.stats.count
+
+    def add(self, rtt_ns, timestamp_ns=None):
+        self.samples.append((time.perf_counter_ns() if timestamp_ns is None else timestamp_ns, rtt_ns))
+        self.stats.add(rtt_ns)
+        for estimator in self.quantiles.values():
+            estimator.add(rtt_ns)
+        # Titreşim: ardışık RTT farklarının mutlak ortalaması
+        if self._last is not None:
+            self._jitter.add(abs(rtt_ns - self._last))
+        self._last = rtt_ns
+
+    def percentile(self, p):
+        capacity = self.samples.capacity
+        if capacity is None or self.stats.count <= capacity:
+            return self.samples.percentile('rtt', p)
+        return self.quantiles[p].value()
+
+    def summary(self):
+        # Tüm değerler ms
+        if not self.stats.count:
+            return {'count': 0}
+        ms = 1e-6
+        return {
+            'count': self.stats.count,
+            'min': self.stats.min * ms,
+            'p50': self.percentile(0.5) * ms,
+            'p95': self.percentile(0.95) * ms,
+            'p99': self.percentile(0.99) * ms,
+            'max': self.stats.max * ms,
+            'mean': self.stats.mean * ms,
+            'jitter': self._jitter.mean * ms,
+        }
+
+
+async def _latency_request(connection, sequence, timeout, path):
+    started = time.perf_counter_ns()
+    response = await asyncio.wait_for(
+        connection.request('GET', f'{path}?x={time.time_ns()}.{sequence}',
+                           headers={'Cache-Control': 'no-cache'}),
+        timeout
+    )
+    rtt = time.perf_counter_ns() - started
+    if response.status != 200 or not response.body.startswith(b'test=test'):
+        raise HTTPError(f'unexpected latency response from {connection.host}')
+    return started, rtt
+
+
+async def _sample_latency(target, count, timeout, pool, on_rtt, interval=0.0, stop=None):
+    # Bağlantı kurulduktan sonra aynı bağlantı üzerinden RTT örnekleri alınır;
+    # TCP el sıkışması ölçüme katılmaz. `count` None ise `stop` beklenir.
+    endpoint = resolve_endpoint(target)
+    own_pool = pool is None
+    if own_pool:
+        pool = ConnectionPool(timeout)
+    connection = None
+    i = 0
+    try:
+        while (count is None or i < count) and not (stop is not None and stop.is_set()):
+            if i and interval:
+                await asyncio.sleep(interval)
+            if connection is None or not connection.is_open:
+                connection = await asyncio.wait_for(
+                    pool.acquire(endpoint.host, endpoint.port, endpoint.secure, endpoint.factory), timeout
+                )
+            if stop is None:
+                on_rtt(*await endpoint.ping(connection, i, timeout))
+            else:
+                # Yük altında zaman aşımı da bir ölçümdür: üst sınır olarak kaydedilir
+                started = time.perf_counter_ns()
+                try:
+                    on_rtt(*await endpoint.ping(connection, i, timeout))
+                except asyncio.TimeoutError:
+                    on_rtt(started, time.perf_counter_ns() - started)
+            i += 1
+    except BaseException:
+        if connection is not None:
+            connection.close()
+        raise
+    if connection is not None:
+        pool.release(connection)
+    if own_pool:
+        pool.close()
+
+
+async def probe_server(target, samples=PROBE_SAMPLES, timeout=PROBE_TIMEOUT, pool=None):
+    rtts = []
+    await _sample_latency(target, samples, timeout, pool, lambda _, rtt: rtts.append(rtt / 1e9))
+    return rtts
+
+
+async def measure_latency(target, count=LATENCY_SAMPLES, interval=LATENCY_INTERVAL,
+                          timeout=PROBE_TIMEOUT, pool=None, series=None):
+    series = series if series is not None else LatencySeries()
+    await _sample_latency(target, count, timeout, pool,
+                          lambda started, rtt: series.add(rtt, started), interval)
+    return series
+
+
+async def monitor_latency(target, stop, interval=LOADED_INTERVAL, timeout=PROBE_TIMEOUT, series=None,
+                          local_addr=None):
+    # Bant genişliği fazlarıyla eşzamanlı, ayrı bir bağlantı üzerinden hafif yoklama
+    series = series if series is not None else LatencySeries()
+    pool = ConnectionPool(timeout, local_addr=local_addr)
+    try:
+        await _sample_latency(target, None, timeout, pool,
+                              lambda started, rtt: series.add(rtt, started), interval, stop)
+    finally:
+        pool.close()
+    return series
+
+
+def bufferbloat_grade(idle, loaded):
+    # Yük altındaki medyan gecikme artışına (ms) göre not
+    increase = max(0.0, loaded - idle)
+    for limit, grade in BUFFERBLOAT_GRADES:
+        if increase < limit:
+            return grade
+    return 'F'
+
+
+async def select_best_server(servers, top=5, samples=PROBE_SAMPLES, timeout=PROBE_TIMEOUT, margin=0.5,
+                             pool=None, endpoint=None):
+    # En yakın `top` sunucu eşzamanlı ölçülür. Her yoklama aynı işi yaptığından
+    # bitiş süresi RTT ile orantılıdır: ilk başarılı yoklamanın süresinin
+    # (1 + margin) katında bitmeyenler kazanamaz ve iptal edilir.
+    endpoint = endpoint or (lambda server: server['url'])
+    candidates = list(servers)[:top]
+    if not candidates:
+        raise HTTPError('no servers to probe')
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks = {
+        asyncio.create_task(probe_server(endpoint(server), samples, timeout, pool)): server
+        for server in candidates
+    }
+    results = []
+    pending = set(tasks)
+    try:
+        while pending and not results:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            results.extend(task for task in done if not task.exception())
+        if pending and results:
+            grace = (loop.time() - started) * margin
+            done, pending = await asyncio.wait(pending, timeout=grace)
+            results.extend(task for task in done if not task.exception())
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if not results:
+        errors = [task.exception() for task in tasks if task.done() and not task.cancelled()]
+        raise errors[0] if errors else HTTPError('no server answered')
+
+    best = None
+    for task in results:
+        server = dict(tasks[task])
+        server['latency'] = statistics.median(task.result()) * 1000
+        server['rtts'] = task.result()
+        if best is None or server['latency'] < best['latency']:
+            best = server
+    return best
@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import sqlite3
+import sys
+
+from . import MEGABIT, __version__
+from .backends import BACKENDS, create_backend
+from .fleet import run_fleet, run_uplinks
+from .export import FORMATS as EXPORT_FORMATS, export_history, parse_time
+from .history import HistoryStore
+from .interfaces import local_interfaces, resolve_source
+from .metrics import DEFAULT_PORT as METRICS_PORT, MetricsExporter
+from .pipeline import CancelToken, run_test
+from .scheduler import JsonlSink, Scheduler, parse_schedule
+from .server import DEFAULT_PORT, SOURCE_SIZE, ReferenceServer
+
+# Bu modül PyQt5'i içe aktarmaz; başsız makinelerde ve cron'da çalışır.
+
+FORMATS = ('json', 'jsonl', 'text')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='runner', description='Runner internet speed test')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+
+    test = parser.add_argument_group('measurement')
+    test.add_argument('-b', '--backend', choices=sorted(BACKENDS), default='http',
+                      help='measurement backend (default: %(default)s)')
+    test.add_argument('-s', '--server', action='append', dest='servers', metavar='SERVER',
+                      help='upload.php URL or host:port; repeat to choose among several '
+                           '(default: nearest speedtest.net servers)')
+    test.add_argument('--candidates', type=int,
+                      help='number of nearest servers to consider when --server is not given')
+    test.add_argument('--streams', type=int, help='initial number of parallel streams')
+    test.add_argument('--max-streams', type=int, help='upper bound on parallel streams')
+    test.add_argument('-d', '--duration', type=float, help='maximum seconds per transfer phase')
+    test.add_argument('--adaptive', action='store_true', help='stop a phase early once throughput converges')
+    test.add_argument('--loaded-latency', action='store_true', help='measure latency during transfers')
+    test.add_argument('--timeout', type=float, default=10.0, help='network timeout in seconds (default: %(default)s)')
+    test.add_argument('-f', '--format', choices=FORMATS, default='json', help='output format (default: %(default)s)')
+    test.add_argument('--samples', action='store_true', help='include per-interval throughput samples')
+    test.add_argument('--history', metavar='PATH', help='history database (default: history.sqlite3 in the data directory)')
+    test.add_argument('--no-history', action='store_true', help='do not record results in the history database')
+
+    fleet = parser.add_argument_group('fleet')
+    fleet.add_argument('--fleet', action='store_true',
+                       help='measure every --server (or every candidate) instead of only the best one')
+    fleet.add_argument('--parallel', type=int, default=1,
+                       help='bandwidth tests to run at the same time in fleet mode (default: %(default)s)')
+
+    uplinks = parser.add_argument_group('uplinks')
+    uplinks.add_argument('--source', action='append', dest='sources', metavar='ADDRESS',
+                         help='bind measurements to this local address or interface; repeat to compare uplinks')
+    uplinks.add_argument('--all-interfaces', action='store_true',
+                         help='compare every local interface address (IPv4 unless --ipv6)')
+    uplinks.add_argument('--ipv6', action='store_true', help='include IPv6 addresses with --all-interfaces')
+    uplinks.add_argument('--list-interfaces', action='store_true', help='list local interface addresses and exit')
+
+    daemon = parser.add_argument_group('daemon')
+    daemon.add_argument('--daemon', action='store_true', help='run measurements on a schedule until stopped')
+    daemon.add_argument('--schedule', default='1h',
+                        help='interval (900, 15m, 2h) or cron expression ("*/15 * * * *") (default: %(default)s)')
+    daemon.add_argument('--jitter', type=float, default=60.0,
+                        help='random delay of up to this many seconds per run (default: %(default)s)')
+    daemon.add_argument('--busy-mbps', type=float,
+                        help='skip a run when existing link traffic exceeds this rate')
+    daemon.add_argument('--run-now', action='store_true', help='run the first measurement immediately')
+    daemon.add_argument('--metrics-port', type=int, nargs='?', const=METRICS_PORT,
+                        help=f'serve the latest results as OpenMetrics on this port (default: {METRICS_PORT})')
+    daemon.add_argument('--metrics-bind', default='127.0.0.1',
+                        help='address for the metrics endpoint (default: %(default)s)')
+    daemon.add_argument('-o', '--output',
+                        help='daemon: also append results as JSON lines to this file; '
+                             'export: destination file (default: standard output)')
+
+    export = parser.add_argument_group('history export')
+    export.add_argument('--export', choices=EXPORT_FORMATS, metavar='FORMAT',
+                        help=f'export the result history ({", ".join(EXPORT_FORMATS)}); '
+                             '--server filters by server host')
+    export.add_argument('--since', help='Unix time, ISO date or a duration back from now (7d, 12h)')
+    export.add_argument('--until', help='same formats as --since')
+
+    server = parser.add_argument_group('reference server')
+    server.add_argument('--serve', action='store_true',
+                        help='run the local reference server (HTTP and TCP speedtest protocols)')
+    server.add_argument('--bind', default='0.0.0.0', help='address for --serve (default: %(default)s)')
+    server.add_argument('--port', type=int, default=DEFAULT_PORT, help='port for --serve (default: %(default)s)')
+    server.add_argument('--source-size', type=int, default=SOURCE_SIZE // (1024 * 1024), metavar='MIB',
+                        help='size of the random download file in MiB (default: %(default)s)')
+    return parser
+
+
+def backend_options(args, source_address=None):
+    options = {'servers': args.servers, 'timeout': args.timeout}
+    if source_address:
+        options['source_address'] = source_address
+    if args.candidates:
+        options['candidates'] = args.candidates
+    if args.backend == 'speedtest':
+        return options
+    # Yalnızca verilen seçenekler aktarılır, gerisi motorun varsayılanıdır
+    engine = {
+        'streams': args.streams,
+        'max_streams': args.max_streams,
+        'duration': args.duration,
+    }
+    options.update({key: value for key, value in engine.items() if value is not None})
+    if args.adaptive:
+        options['adaptive'] = True
+    if args.loaded_latency:
+        options['loaded_latency'] = True
+    return options
+
+
+def format_text(result):
+    def mbps(bits):
+        return f'{bits / MEGABIT:.2f} Mbps' if bits else '-'
+
+    server = result.server or {}
+    lines = [
+        f"Server:   {server.get('sponsor') or server.get('name', '')} ({server.get('host', '')})",
+        f'Ping:     {result.ping:.2f} ms',
+    ]
+    if result.latency.get('count', 0) > 1:
+        lines.append(f"Jitter:   {result.latency['jitter']:.2f} ms")
+    for phase, phase_result in (('Download', result.download), ('Upload', result.upload)):
+        if phase_result is None:
+            lines.append(f'{phase + ":":<10}-')
+            continue
+        line = f'{phase + ":":<10}{mbps(phase_result.bits_per_second)}'
+        if phase_result.steady_bits_per_second:
+            line += f' (steady {mbps(phase_result.steady_bits_per_second)})'
+        lines.append(line)
+    if result.bufferbloat:
+        lines.append(f"Bufferbloat: {result.bufferbloat['grade']}")
+    if result.cancelled:
+        lines.append('Cancelled: partial result')
+    return '\n'.join(lines)
+
+
+def format_fleet_text(report):
+    def mbps(bits):
+        return f'{bits / MEGABIT:.2f}' if bits else '-'
+
+    lines = [f"{'Target':<32}{'Ping ms':>10}{'Down Mbps':>12}{'Up Mbps':>12}"]
+    for target in report.targets:
+        host = (target.label or '')[:31]
+        if target.result is None:
+            lines.append(f'{host:<32}  error: {target.error}')
+            continue
+        result = target.result
+        lines.append(f'{host:<32}{result.ping:>10.2f}{mbps(result.download.bits_per_second):>12}'
+                     f'{mbps(result.upload.bits_per_second):>12}')
+    summary = report.summary()
+    lines.append(f"{summary['succeeded']}/{summary['targets']} targets measured")
+    return '\n'.join(lines)
+
+
+def write_fleet(report, fmt, samples=False, stream=sys.stdout):
+    if fmt == 'text':
+        print(format_fleet_text(report), file=stream)
+    elif fmt == 'jsonl':
+        for target in report.targets:
+            print(json.dumps(target.as_dict(samples), separators=(',', ':')), file=stream)
+    else:
+        print(json.dumps(report.as_dict(samples), indent=2), file=stream)
+    stream.flush()
+
+
+def write_result(result, fmt, samples=False, stream=sys.stdout):
+    if fmt == 'text':
+        print(format_text(result), file=stream)
+    elif fmt == 'jsonl':
+        print(json.dumps(result.as_dict(samples), separators=(',', ':')), file=stream)
+    else:
+        print(json.dumps(result.as_dict(samples), indent=2), file=stream)
+    stream.flush()
+
+
+async def measure(backend):
+    # İlk Ctrl+C testi iptal eder; akışlar kesilir ve kısmi sonuç döner
+    cancel = CancelToken()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, cancel.cancel)
+    except (NotImplementedError, RuntimeError):
+        return await run_test(backend)
+    try:
+        return await run_test(backend, cancel=cancel)
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+
+
+async def serve(bind, port, source_size):
+    async with ReferenceServer(bind, port, source_size) as server:
+        print(f'Runner reference server listening on {server.address}', file=sys.stderr)
+        await server.serve_forever()
+
+
+async def daemon(args, history, metrics=None):
+    sinks = [history.add] if history is not None else []
+    if args.output:
+        sinks.append(JsonlSink(args.output))
+    if metrics is not None:
+        sinks.append(metrics.update)
+
+    def sink(result):
+        for write in sinks:
+            write(result)
+
+    scheduler = Scheduler(
+        lambda: create_backend(args.backend, **backend_options(args)),
+        parse_schedule(args.schedule),
+        jitter=args.jitter,
+        busy_threshold=args.busy_mbps * MEGABIT if args.busy_mbps else None,
+        sink=sink,
+        on_failure=metrics.record_failure if metrics is not None else None,
+        run_now=args.run_now,
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    await scheduler.run(stop)
+
+
+def open_history(args):
+    return None if args.no_history else HistoryStore(args.history)
+
+
+def export(args):
+    since = parse_time(args.since) if args.since else None
+    until = parse_time(args.until) if args.until else None
+    with HistoryStore(args.history) as history:
+        count = export_history(history, args.output or '-', args.export, since, until, args.servers)
+    print(f'runner: exported {count} results', file=sys.stderr)
+
+
+def source_addresses(args):
+    sources = [resolve_source(source) for source in args.sources or ()]
+    if args.all_interfaces:
+        sources += [interface.address for interface in local_interfaces(include_ipv6=args.ipv6)
+                    if interface.address not in sources]
+    return sources
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list_interfaces:
+        for interface in local_interfaces(include_ipv6=True):
+            print(f'{interface.name or "-":<16}{interface.address}')
+        return 0
+    if args.export:
+        try:
+            export(args)
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f'runner: {e}', file=sys.stderr)
+            return 1
+        return 0
+    if args.daemon:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+        history = metrics = None
+        try:
+            history = open_history(args)
+            if args.metrics_port is not None:
+                metrics = MetricsExporter(args.metrics_bind, args.metrics_port).start()
+            asyncio.run(daemon(args, history, metrics))
+        except KeyboardInterrupt:
+            pass
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f'runner: {e}', file=sys.stderr)
+            return 2
+        finally:
+            if metrics is not None:
+                metrics.close()
+            if history is not None:
+                history.close()
+        return 0
+    if args.serve:
+        try:
+            asyncio.run(serve(args.bind, args.port, args.source_size * 1024 * 1024))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    try:
+        sources = source_addresses(args)
+        report = None
+        if len(sources) > 1 or args.all_interfaces:
+            # Uplink karşılaştırması: her kaynak adres için ayrı bir ölçüm
+            if args.fleet:
+                raise ValueError('--fleet cannot be combined with several --source addresses')
+            if not sources:
+                raise ValueError('no usable local interface addresses found')
+            report = asyncio.run(run_uplinks(
+                lambda source: create_backend(args.backend, **backend_options(args, source)), sources
+            ))
+            results = report.results
+        elif args.fleet:
+            backend = create_backend(args.backend, **backend_options(args, sources[0] if sources else None))
+            report = asyncio.run(run_fleet(backend, args.parallel))
+            results = report.results
+        else:
+            backend = create_backend(args.backend, **backend_options(args, sources[0] if sources else None))
+            results = [asyncio.run(measure(backend))]
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f'runner: {e}', file=sys.stderr)
+        return 1
+    if report is not None:
+        write_fleet(report, args.format, args.samples)
+    else:
+        write_result(results[0], args.format, args.samples)
+        if results[0].cancelled:
+            # Kısmi sonuç geçmişe yazılmaz
+            return 130
+    # Sonuç yazıldıktan sonra geçmiş açılamazsa da hata koduyla çıkılır
+    try:
+        history = open_history(args)
+    except (OSError, sqlite3.Error) as e:
+        print(f'runner: history: {e}', file=sys.stderr)
+        return 1
+    if history is not None:
+        for result in results:
+            history.add(result)
+        history.close()
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
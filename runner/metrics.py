@@ -0,0 +1,137 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 9469
+OPENMETRICS_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class MetricsExporter:
+    # Son ölçümü OpenMetrics olarak sunan küçük HTTP uç noktası. Gövde her
+    # test sonunda bir kez üretilir (OpenMetrics ve Prometheus metin biçimi);
+    # istekler hazır baytları döndürür, ölçümle hiçbir şey paylaşmaz.
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.runs = 0
+        self.failures = 0
+        self.result = None
+        self._lock = threading.Lock()
+        self._bodies = self._render()
+        self._server = None
+        self._thread = None
+
+    def update(self, result):
+        with self._lock:
+            self.runs += 1
+            self.result = result
+            self._bodies = self._render()
+
+    def record_failure(self, *args):
+        with self._lock:
+            self.failures += 1
+            self._bodies = self._render()
+
+    def _render(self):
+        families = [
+            ('runner_runs', 'counter', 'Completed measurements.', [({}, self.runs)]),
+            ('runner_failures', 'counter', 'Failed measurements.', [({}, self.failures)]),
+        ]
+        result = self.result
+        if result is not None:
+            server = result.server
+            labels = {
+                'backend': result.backend,
+                'server': server.get('host', ''),
+                'name': server.get('sponsor') or server.get('name', ''),
+            }
+            latency = result.latency
+            ms = 1e-3
+            families += [
+                ('runner_ping_seconds', 'gauge', 'Median idle round-trip time.', [(labels, result.ping * ms)]),
+                ('runner_download_bits_per_second', 'gauge', 'Download throughput.',
+                 [(labels, result.download.bits_per_second)]),
+                ('runner_upload_bits_per_second', 'gauge', 'Upload throughput.',
+                 [(labels, result.upload.bits_per_second)]),
+                ('runner_last_run_timestamp_seconds', 'gauge', 'Completion time of the last measurement.',
+                 [(labels, result.timestamp)]),
+            ]
+            if latency.get('count', 0) > 1:
+                families += [
+                    ('runner_jitter_seconds', 'gauge', 'Mean difference between consecutive round trips.',
+                     [(labels, latency['jitter'] * ms)]),
+                    ('runner_latency_seconds', 'gauge', 'Idle round-trip time quantiles.',
+                     [({**labels, 'percentile': key}, latency[key] * ms) for key in ('p50', 'p95', 'p99')]),
+                ]
+            if result.bufferbloat:
+                families.append(
+                    ('runner_loaded_latency_seconds', 'gauge', 'Median round-trip time under load.',
+                     [({**labels, 'phase': phase}, result.bufferbloat[phase] * ms)
+                      for phase in ('idle', 'download', 'upload') if phase in result.bufferbloat])
+                )
+
+        openmetrics, prometheus = [], []
+        for name, kind, help_text, samples in families:
+            # OpenMetrics sayacın adını _total'sız bildirir; eski biçim ekiyle
+            exposed = f'{name}_total' if kind == 'counter' else name
+            for lines, family in ((openmetrics, name), (prometheus, exposed)):
+                lines.append(f'# HELP {family} {help_text}')
+                lines.append(f'# TYPE {family} {kind}')
+                lines.extend(f'{exposed}{_labels(labels)} {value!r}' for labels, value in samples)
+        openmetrics.append('# EOF')
+        return ('\n'.join(openmetrics) + '\n').encode(), ('\n'.join(prometheus) + '\n').encode()
+
+    def body(self, openmetrics=True):
+        return self._bodies[0 if openmetrics else 1]
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+                body = exporter.body(openmetrics)
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            do_HEAD = do_GET
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='runner-metrics', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+from dataclasses import asdict, dataclass, field, replace
+
+from .engine import PhaseResult
+from .latency import bufferbloat_grade
+from .pool import PoolStats
+
+SERVER_FIELDS = ('id', 'name', 'sponsor', 'country', 'host', 'url', 'd', 'latency')
+
+
+@dataclass
+class MeasurementResult:
+    backend: str
+    server: dict
+    latency: dict
+    download: PhaseResult
+    upload: PhaseResult
+    bufferbloat: dict = None
+    pool: PoolStats = None
+    timestamp: float = field(default_factory=time.time)
+    # İptal edilen testte tamamlanmayan fazlar None kalır
+    cancelled: bool = False
+
+    @property
+    def ping(self):
+        return self.latency.get('p50') or 0.0
+
+    def as_dict(self, samples=False):
+        # JSON'a dönüştürülebilir kayıt; örnek serileri yalnızca istenirse eklenir
+        return {
+            'timestamp': self.timestamp,
+            'backend': self.backend,
+            'server': {key: self.server[key] for key in SERVER_FIELDS if key in self.server} if self.server else None,
+            'latency': self.latency,
+            'download': self.download.as_dict(samples) if self.download is not None else None,
+            'upload': self.upload.as_dict(samples) if self.upload is not None else None,
+            'bufferbloat': self.bufferbloat,
+            'pool': asdict(self.pool) if self.pool is not None else None,
+            'cancelled': self.cancelled,
+        }
+
+
+class CancelToken:
+    # Bir testin iptal isteği. cancel() herhangi bir iş parçacığından (ör. arayüz)
+    # çağrılabilir; kayıtlı geri çağrılar kendi olay döngülerinde çalışır.
+
+    def __init__(self):
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._next = 0
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for loop, callback in callbacks:
+            try:
+                loop.call_soon_threadsafe(callback)
+            except RuntimeError:
+                # Döngü bu arada kapanmış
+                pass
+
+    def register(self, callback):
+        # Çalışan döngüye bağlanır; kaydı silen bir işlev döner
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.cancelled:
+                loop.call_soon(callback)
+                return lambda: None
+            key = self._next
+            self._next += 1
+            self._callbacks[key] = (loop, callback)
+
+        def unregister():
+            with self._lock:
+                self._callbacks.pop(key, None)
+        return unregister
+
+
+class _Cancelled(Exception):
+    pass
+
+
+async def _cancellable(awaitable, cancel):
+    # Keşif, sunucu seçimi ve gecikme adımları görev iptaliyle kesilir
+    task = asyncio.ensure_future(awaitable)
+    unregister = cancel.register(task.cancel)
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if not cancel.cancelled:
+            raise
+        raise _Cancelled from None
+    finally:
+        unregister()
+
+
+def grade_bufferbloat(latency, download, upload):
+    # Boşta ve yük altındaki medyan gecikmeler; not en kötü faza göre verilir
+    idle = latency['p50']
+    report = {'idle': idle}
+    for phase, result in (('download', download), ('upload', upload)):
+        if result.loaded_latency and result.loaded_latency.get('count'):
+            report[phase] = result.loaded_latency['p50']
+    loaded = max((report[phase] for phase in ('download', 'upload') if phase in report), default=idle)
+    report['grade'] = bufferbloat_grade(idle, loaded)
+    return report
+
+
+async def run_phases(backend, progress=None, on_sample=None, cancel=None, server=None):
+    # run_test'in gövdesi; arka uç açık olmalıdır. `server` verilirse keşif ve
+    # sunucu seçimi atlanır (bkz. worker.MeasurementWorker).
+    progress = progress or (lambda value: None)
+    cancel = cancel or CancelToken()
+    backend.cancel = cancel
+
+    def sampler(phase):
+        return (lambda sample: on_sample(phase, sample)) if on_sample is not None else None
+
+    before = replace(backend.stats) if backend.stats is not None else None
+    result = MeasurementResult(backend.name, None, {}, None, None)
+    try:
+        if server is None:
+            servers = await _cancellable(backend.discover(), cancel)
+            progress(10)
+            server = await _cancellable(backend.select_server(servers), cancel)
+        else:
+            progress(10)
+        result.server = server
+        result.latency = await _cancellable(backend.latency(server), cancel)
+        progress(30)
+
+        result.download = await backend.download(server, sampler('download'))
+        if cancel.cancelled:
+            raise _Cancelled
+        progress(70)
+
+        result.upload = await backend.upload(server, sampler('upload'))
+    except _Cancelled:
+        pass
+    result.cancelled = cancel.cancelled
+    # Havuz çalıştırmalar arasında açık kalabilir; yalnızca bu testin payı raporlanır
+    result.pool = backend.stats.since(before) if before is not None else None
+
+    if backend.loaded_latency and not result.cancelled:
+        result.bufferbloat = grade_bufferbloat(result.latency, result.download, result.upload)
+    result.timestamp = time.time()
+    return result
+
+
+async def open_backend(backend, cancel):
+    # Açılış da (speedtest-cli'de yapılandırma indirme) iptal edilebilir;
+    # iptal edilirse arka uç kapatılır ve False döner
+    try:
+        await _cancellable(backend.open(), cancel)
+    except _Cancelled:
+        await backend.close()
+        return False
+    return True
+
+
+def cancelled_result(backend):
+    # Henüz hiçbir faz başlamadan iptal edilen test
+    return MeasurementResult(backend.name, None, {}, None, None, cancelled=True)
+
+
+async def run_test(backend, progress=None, on_sample=None, cancel=None):
+    # Keşif -> sunucu seçimi -> gecikme -> indirme -> yükleme.
+    # progress(yüzde), on_sample(faz, örnek). `cancel` (CancelToken) tetiklenirse
+    # çalışan faz kesilir ve o ana kadarki kısmi sonuç cancelled=True ile döner.
+    cancel = cancel or CancelToken()
+    if not await open_backend(backend, cancel):
+        return cancelled_result(backend)
+    try:
+        return await run_phases(backend, progress, on_sample, cancel)
+    finally:
+        await backend.close()
@@ -0,0 +1,116 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from .http import HTTPConnection
+
+IDLE_TIMEOUT = 15.0
+MAX_IDLE = 64
+DNS_TTL = 300.0
+
+
+@dataclass
+class PoolStats:
+    opened: int = 0
+    reused: int = 0
+    discarded: int = 0
+    resolved: int = 0
+
+    def since(self, earlier):
+        # İki anlık görüntü arasındaki fark (ör. açık kalan havuzda tek bir test)
+        return PoolStats(*(getattr(self, name) - getattr(earlier, name) for name in self.__dataclass_fields__))
+
+    def plus(self, other):
+        return PoolStats(*(getattr(self, name) + getattr(other, name) for name in self.__dataclass_fields__))
+
+    def count(self, name, stats=None):
+        setattr(self, name, getattr(self, name) + 1)
+        if stats is not None:
+            setattr(stats, name, getattr(stats, name) + 1)
+
+
+class ConnectionPool:
+    # Sunucu ve bağlantı türü başına boşta bekleyen keep-alive bağlantıları.
+    # Gecikme yoklaması, indirme ve yükleme aynı havuzdan beslenir; el sıkışma
+    # tekrarlanmaz. `local_addr` verilirse tüm bağlantılar o kaynak adresten
+    # açılır (ör. belirli bir uplink). Çözülen adresler `dns_ttl` boyunca
+    # saklanır; havuz açık kaldıkça yeni bağlantılar DNS beklemez.
+    # acquire()'a `stats` verilirse sayaçlar ona da işlenir; havuzu aynı anda
+    # paylaşan ölçümler (ör. paralel filo hedefleri) kendi paylarını ayrı görür.
+
+    def __init__(self, timeout=10.0, idle_timeout=IDLE_TIMEOUT, max_idle=MAX_IDLE, local_addr=None,
+                 dns_ttl=DNS_TTL):
+        self.timeout = timeout
+        self.local_addr = local_addr
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self.dns_ttl = dns_ttl
+        self.stats = PoolStats()
+        self._idle = {}
+        self._addresses = {}
+
+    async def resolve(self, host, port, stats=None):
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        now = time.monotonic()
+        cached = self._addresses.get((host, port))
+        if cached is not None and now - cached[1] < self.dns_ttl:
+            return cached[0]
+        family = socket.AF_UNSPEC
+        if self.local_addr:
+            family = socket.AF_INET6 if ':' in self.local_addr else socket.AF_INET
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, family=family, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        self._addresses[(host, port)] = (address, now)
+        self.stats.count('resolved', stats)
+        return address
+
+    async def acquire(self, host, port, secure=False, factory=HTTPConnection, stats=None):
+        idle = self._idle.get((factory, host, port, secure))
+        now = time.monotonic()
+        while idle:
+            connection, released = idle.pop()
+            if connection.is_open and now - released < self.idle_timeout:
+                self.stats.count('reused', stats)
+                return connection
+            connection.close()
+            self.stats.count('discarded', stats)
+        connection = factory(host, port, secure, local_addr=self.local_addr,
+                             address=await self.resolve(host, port, stats))
+        try:
+            await connection.connect(self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            # Adres değişmiş olabilir; bir sonraki deneme yeniden çözer
+            self._addresses.pop((host, port), None)
+            raise
+        self.stats.count('opened', stats)
+        return connection
+
+    def release(self, connection):
+        if not connection.is_idle:
+            connection.close()
+            return
+        key = (type(connection), connection.host, connection.port, connection.secure)
+        idle = self._idle.setdefault(key, deque())
+        if len(idle) >= self.max_idle:
+            connection.close()
+            self.stats.discarded += 1
+            return
+        idle.append((connection, time.monotonic()))
+
+    def close(self):
+        for idle in self._idle.values():
+            for connection, _ in idle:
+                connection.close()
+        self._idle.clear()
+
+    def forget(self):
+        # Ağ değişince (arayüz, VPN) önbellekteki adresler ve bağlantılar bırakılır
+        self.close()
+        self._addresses.clear()
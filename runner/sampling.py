@@ -0,0 +1,248 @@
+import asyncio
+import math
+import struct
+import sys
+import time
+from array import array
+from collections import deque, namedtuple
+
+from . import MEGABIT
+
+SAMPLE_INTERVAL = 0.1
+SAMPLE_CAPACITY = 1200
+
+# time: fazın başından itibaren saniye, nbytes: aralıkta aktarılan bayt
+Sample = namedtuple('Sample', 'time nbytes mbps')
+
+_SERIES_HEADER = struct.Struct('<4sBQ')
+_SERIES_MAGIC = b'RSS1'
+
+
+class SampleSeries:
+    # Sütun tabanlı örnek deposu: her alan bir array('d')/array('q').
+    # Örnek başına 8 bayt/alan tutar; namedtuple ya da sözlük listesine göre
+    # çok daha az bellek kullanır. Öğeler ve yineleme `record` türünde döner,
+    # dilimleme yeni bir seri üretir. `capacity` verilirse en eski örnekler
+    # atılır (halka tampon gibi).
+
+    __slots__ = ('record', 'typecodes', 'columns', 'capacity')
+
+    def __init__(self, record=Sample, typecodes='dqd', capacity=None):
+        if len(typecodes) != len(record._fields):
+            raise ValueError('one typecode per record field is required')
+        self.record = record
+        self.typecodes = typecodes
+        self.columns = tuple(array(code) for code in typecodes)
+        self.capacity = capacity
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __iter__(self):
+        return map(self.record, *self.columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            series = SampleSeries(self.record, self.typecodes, self.capacity)
+            series.columns = tuple(column[index] for column in self.columns)
+            return series
+        return self.record(*(column[index] for column in self.columns))
+
+    def __repr__(self):
+        return f'SampleSeries({self.record.__name__}, {len(self)} samples)'
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sum(sys.getsizeof(column) for column in self.columns)
+
+    def append(self, values):
+        for column, value in zip(self.columns, values):
+            column.append(value)
+        if self.capacity is not None and len(self) > self.capacity:
+            excess = len(self) - self.capacity
+            for column in self.columns:
+                del column[:excess]
+
+    def extend(self, records):
+        for values in records:
+            self.append(values)
+
+    def clear(self):
+        for column in self.columns:
+            del column[:]
+
+    def column(self, name):
+        return self.columns[self.record._fields.index(name)]
+
+    def mean(self, name):
+        column = self.column(name)
+        return math.fsum(column) / len(column) if column else math.nan
+
+    def percentile(self, name, p):
+        # Doğrusal aradeğerleme; p 0..1
+        ordered = sorted(self.column(name))
+        if not ordered:
+            return math.nan
+        rank = p * (len(ordered) - 1)
+        lo = math.floor(rank)
+        hi = min(lo + 1, len(ordered) - 1)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+    def rolling_mean(self, name, window):
+        # Her konumda son `window` örneğin ortalaması (ilk konumlarda eldeki kadarı)
+        column = self.column(name)
+        result = array('d', bytes(8 * len(column)))
+        total = 0.0
+        for i, value in enumerate(column):
+            total += value
+            if i >= window:
+                total -= column[i - window]
+            result[i] = total / min(i + 1, window)
+        return result
+
+    def to_bytes(self):
+        # Başlık + tür kodları + küçük sonlu (little-endian) sütunlar
+        parts = [_SERIES_HEADER.pack(_SERIES_MAGIC, len(self.columns), len(self)), self.typecodes.encode()]
+        for column in self.columns:
+            if sys.byteorder == 'big':
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, record=Sample, capacity=None):
+        magic, width, count = _SERIES_HEADER.unpack_from(data)
+        if magic != _SERIES_MAGIC:
+            raise ValueError('not a serialized sample series')
+        offset = _SERIES_HEADER.size
+        typecodes = bytes(data[offset:offset + width]).decode()
+        offset += width
+        series = cls(record, typecodes, capacity)
+        for column in series.columns:
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            offset += size
+        return series
+
+
+class ThroughputSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL, capacity=SAMPLE_CAPACITY, callback=None):
+        self.interval = interval
+        self.callback = callback
+        self.samples = SampleSeries(Sample, 'dqd', capacity)
+
+    def record(self, elapsed, nbytes, dt):
+        sample = Sample(elapsed, nbytes, nbytes * 8 / dt / MEGABIT if dt > 0 else 0.0)
+        self.samples.append(sample)
+        if self.callback is not None:
+            self.callback(sample)
+        return sample
+
+    async def run(self, counter, start):
+        # Zamanlama başlangıca göre sabitlenir; gecikmeler birikmez
+        self.samples.clear()
+        last_bytes, last_time = counter(), start
+        while True:
+            tick = math.floor((time.monotonic() - start) / self.interval) + 1
+            await asyncio.sleep(max(0.0, start + tick * self.interval - time.monotonic()))
+            now, total = time.monotonic(), counter()
+            self.record(now - start, total - last_bytes, now - last_time)
+            last_bytes, last_time = total, now
+
+
+class ConvergenceEstimator:
+    # Ardışık iki pencerenin ortalaması `tolerance` oranında örtüştüğünde
+    # verim yakınsamış sayılır. Toplamlar akış halinde tutulur (O(1)).
+
+    def __init__(self, window=1.0, tolerance=0.05, min_duration=2.0, interval=SAMPLE_INTERVAL):
+        self.size = max(1, round(window / interval))
+        self.tolerance = tolerance
+        self.min_duration = min_duration
+        self._rates = deque(maxlen=2 * self.size)
+        self._previous = 0.0
+        self._current = 0.0
+        self.estimate = 0.0
+
+    def update(self, sample):
+        rates = self._rates
+        if len(rates) == rates.maxlen:
+            self._previous -= rates[0]
+        if len(rates) >= self.size:
+            moving = rates[-self.size]
+            self._current -= moving
+            self._previous += moving
+        rates.append(sample.mbps)
+        self._current += sample.mbps
+        self.estimate = self._current / min(len(rates), self.size)
+        return self.converged(sample.time)
+
+    def converged(self, elapsed):
+        if elapsed < self.min_duration or len(self._rates) < self._rates.maxlen:
+            return False
+        current = self._current / self.size
+        previous = self._previous / self.size
+        return current > 0 and abs(current - previous) <= self.tolerance * current
+
+
+def steady_state(samples, threshold=0.9, window=5):
+    # Yavaş başlangıç bölümü: kayan ortalama, fazın ikinci yarısındaki
+    # medyanın `threshold` oranına ilk ulaştığı ana kadar geçen süre.
+    # Dönen değerler: (rampa süresi sn, kararlı verim bit/sn)
+    if not isinstance(samples, SampleSeries):
+        series = SampleSeries(Sample, 'dqd')
+        series.extend(samples)
+        samples = series
+    if len(samples) < 2 * window:
+        return 0.0, None
+
+    smoothed = samples.rolling_mean('mbps', window)
+    tail = sorted(smoothed[len(smoothed) // 2:])
+    reference = tail[len(tail) // 2]
+    if reference <= 0:
+        return 0.0, None
+
+    ramp = next(i for i, rate in enumerate(smoothed) if rate >= threshold * reference)
+    # Kayan pencere geriye baktığından rampa ucu pencerenin başına çekilir
+    ramp = max(0, ramp - window + 1)
+    times = samples.column('time')
+    if ramp:
+        start = times[ramp - 1]
+    else:
+        # Uzun fazlarda halka en eski örnekleri atmış olabilir; süre eldeki
+        # ilk örneğin aralığının başından ölçülür
+        start = max(0.0, times[0] - (times[1] - times[0]))
+    elapsed = times[-1] - start
+    nbytes = sum(samples.column('nbytes')[ramp:])
+    return (start if ramp else 0.0), nbytes * 8 / elapsed if elapsed > 0 else None
+
+
+def lttb(xs, ys, threshold):
+    # Largest-Triangle-Three-Buckets: çizim için `threshold` noktaya indirgeme.
+    # İlk ve son nokta korunur; her kovadan, bir önceki seçilen nokta ile bir
+    # sonraki kovanın ortalamasıyla en büyük üçgeni oluşturan nokta seçilir.
+    # Seçilen noktaların indisleri döner.
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from . import MEGABIT
+from .history import data_dir
+from .worker import MeasurementWorker
+
+log = logging.getLogger(__name__)
+
+BACKOFF = 60.0
+MAX_BACKOFF = 6 * 60 * 60
+BUSY_WINDOW = 1.0
+
+_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+# (alt, üst) sınırlar: dakika, saat, ayın günü, ay, haftanın günü (0 = Pazar)
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+_CRON_HORIZON = 5 * 366
+
+
+class IntervalSchedule:
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError('interval must be positive')
+        self.seconds = seconds
+
+    def next(self, after):
+        return after + self.seconds
+
+    def __repr__(self):
+        return f'IntervalSchedule({self.seconds})'
+
+
+class CronSchedule:
+    # Beş alanlı cron ifadesi; yerel saatle değerlendirilir. Ayın günü ve
+    # haftanın günü birlikte kısıtlanmışsa cron'daki gibi biri yeterlidir.
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f'cron expression needs 5 fields: {expression!r}')
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            self._parse(field, lo, hi) for field, (lo, hi) in zip(fields, _CRON_RANGES)
+        )
+        self.minutes, self.hours, self.days, self.months = minutes, hours, days, months
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field, lo, hi):
+        values = set()
+        for part in field.split(','):
+            expr, _, step = part.partition('/')
+            step = int(step) if step else 1
+            if expr == '*':
+                start, end = lo, hi
+            elif '-' in expr:
+                start, end = map(int, expr.split('-', 1))
+            else:
+                start = end = int(expr)
+                if step > 1:
+                    end = hi
+            if not lo <= start <= end <= hi or step < 1:
+                raise ValueError(f'invalid cron field {field!r}')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        weekday = (moment.weekday() + 1) % 7
+        if self._any_day:
+            return weekday in self.weekdays
+        if self._any_weekday:
+            return moment.day in self.days
+        return moment.day in self.days or weekday in self.weekdays
+
+    def next(self, after):
+        moment = datetime.fromtimestamp(after).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=_CRON_HORIZON)
+        # Eşleşmeyen en büyük birim atlanır; dakika dakika taranmaz
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = divmod(moment.month, 12)
+                moment = moment.replace(year=moment.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f'cron expression never fires: {self.expression!r}')
+
+    def __repr__(self):
+        return f'CronSchedule({self.expression!r})'
+
+
+def parse_schedule(spec):
+    # "900", "15m", "2h" gibi aralıklar ya da "*/15 * * * *", "@hourly" gibi cron ifadeleri
+    spec = _ALIASES.get(spec.strip(), spec.strip())
+    if ' ' in spec:
+        return CronSchedule(spec)
+    unit = _UNITS.get(spec[-1:].lower())
+    try:
+        seconds = float(spec[:-1]) * unit if unit else float(spec)
+    except ValueError:
+        raise ValueError(f'invalid schedule {spec!r}') from None
+    return IntervalSchedule(seconds)
+
+
+def read_link_counters():
+    # Linux: geri döngü hariç tüm arayüzlerin alınan + gönderilen baytları
+    try:
+        with open('/proc/net/dev') as f:
+            lines = f.readlines()[2:]
+    except OSError:
+        return None
+    total = 0
+    for line in lines:
+        name, _, counters = line.partition(':')
+        if name.strip() == 'lo':
+            continue
+        fields = counters.split()
+        total += int(fields[0]) + int(fields[8])
+    return total
+
+
+async def link_rate(window=BUSY_WINDOW):
+    # Bağlantıdaki mevcut trafik (bit/s); ölçülemiyorsa None
+    before = read_link_counters()
+    if before is None:
+        return None
+    started = time.monotonic()
+    await asyncio.sleep(window)
+    after = read_link_counters()
+    return (after - before) * 8 / (time.monotonic() - started)
+
+
+class JsonlSink:
+    # Her sonuç bir JSON satırı olarak eklenir
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir(), 'results.jsonl')
+
+    def __call__(self, result):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(result.as_dict(), separators=(',', ':')) + '\n')
+
+
+class Scheduler:
+    # Zamanlanmış ölçümler. Her çalıştırmaya [0, jitter) rastgele gecikme
+    # eklenir; ardışık hatalarda bir sonraki deneme üstel olarak ertelenir;
+    # bağlantıdaki trafik `busy_threshold` (bit/s) üzerindeyse test atlanır.
+    # Arka uç ve seçilen sunucu testler arasında sıcak tutulur (bkz. worker).
+
+    def __init__(self, backend_factory, schedule, jitter=0.0, busy_threshold=None,
+                 busy_window=BUSY_WINDOW, backoff=BACKOFF, max_backoff=MAX_BACKOFF,
+                 sink=None, on_failure=None, run_now=False):
+        self.worker = MeasurementWorker(backend_factory)
+        self.schedule = schedule
+        self.jitter = jitter
+        self.busy_threshold = busy_threshold
+        self.busy_window = busy_window
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sink = sink if sink is not None else JsonlSink()
+        self.on_failure = on_failure
+        self.run_now = run_now
+        self.failures = 0
+        self.runs = 0
+        self.skipped = 0
+
+    def next_run(self, now):
+        when = self.schedule.next(now) + random.uniform(0, self.jitter)
+        if self.failures:
+            delay = min(self.backoff * 2 ** (self.failures - 1), self.max_backoff)
+            when = max(when, now + delay)
+        return when
+
+    async def link_busy(self):
+        if not self.busy_threshold:
+            return False
+        rate = await link_rate(self.busy_window)
+        if rate is not None and rate > self.busy_threshold:
+            log.info('link busy (%.1f Mbps), skipping run', rate / MEGABIT)
+            return True
+        return False
+
+    async def run_once(self):
+        if await self.link_busy():
+            self.skipped += 1
+            return None
+        self.runs += 1
+        try:
+            result = await self.worker.measure()
+        except Exception as e:
+            self.failures += 1
+            log.warning('measurement failed (%d in a row): %s', self.failures, e)
+            if self.on_failure is not None:
+                self.on_failure(e)
+            return None
+        self.failures = 0
+        try:
+            self.sink(result)
+        except Exception as e:
+            # Yazılamayan sonuç (dolu disk, geçersiz yol) zamanlamayı durdurmaz
+            log.warning('could not store result: %s', e)
+        log.info('measured ping %.1f ms, download %.1f Mbps, upload %.1f Mbps', result.ping,
+                 result.download.bits_per_second / MEGABIT, result.upload.bits_per_second / MEGABIT)
+        return result
+
+    async def run(self, stop=None):
+        stop = stop or asyncio.Event()
+        when = time.time() if self.run_now else self.next_run(time.time())
+        try:
+            while True:
+                log.info('next run at %s', datetime.fromtimestamp(when).isoformat(timespec='seconds'))
+                try:
+                    await asyncio.wait_for(stop.wait(), max(0.0, when - time.time()))
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                await self.run_once()
+                when = self.next_run(time.time())
+        finally:
+            await self.worker.invalidate()
@@ -0,0 +1,341 @@
+import asyncio
+import mmap
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+
+from . import __version__
+
+DEFAULT_PORT = 8080
+SOURCE_SIZE = 64 * 1024 * 1024
+DISCARD_SIZE = 1024 * 1024
+WRITE_CHUNK_SIZE = 1024 * 1024
+MAX_REQUEST_SIZE = 64 * 1024
+MAX_DOWNLOAD_SIZE = 1024 * 1024 * 1024
+
+# speedtest.net sunucularındaki randomNxN.jpg dosyalarının boyutları
+IMAGE_SIZES = {
+    350: 245388, 500: 505544, 750: 1118012, 1000: 1986284, 1500: 4468241,
+    2000: 7907740, 2500: 12407926, 3000: 17816816, 3500: 24262167, 4000: 31625365,
+}
+
+_REQUEST_LINE = re.compile(rb'^[A-Z]+ \S+ HTTP/1\.[01]\r?$')
+_IMAGE_PATH = re.compile(r'/random(\d+)x(\d+)\.jpg$')
+
+
+@dataclass
+class ServerStats:
+    connections: int = 0
+    requests: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+class RandomSource:
+    # İndirme gövdeleri için rastgele veri dosyası. Dosya bellek eşlemli
+    # tutulur (sayfa önbelleğinde sıcak kalır) ve os.sendfile ile gönderilir;
+    # sendfile kullanılamazsa (TLS, bazı platformlar) eşlemin dilimleri yazılır.
+
+    def __init__(self, size=SOURCE_SIZE):
+        self.size = size
+        self.file = tempfile.TemporaryFile()
+        remaining = size
+        while remaining:
+            chunk = os.urandom(min(remaining, 1024 * 1024))
+            self.file.write(chunk)
+            remaining -= len(chunk)
+        self.file.flush()
+        self.map = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ)
+        if hasattr(self.map, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            self.map.madvise(mmap.MADV_WILLNEED)
+        self.view = memoryview(self.map)
+        self._offset = 0
+
+    async def send(self, protocol, count):
+        loop = asyncio.get_running_loop()
+        offset = self._offset
+        self._offset = (self._offset + 7919 * 1024) % self.size
+        while count:
+            n = min(count, self.size - offset)
+            if protocol.sendfile:
+                try:
+                    await loop.sendfile(protocol.transport, self.file, offset, n, fallback=False)
+                except (asyncio.SendfileNotAvailableError, NotImplementedError):
+                    protocol.sendfile = False
+                    continue
+            else:
+                for start in range(offset, offset + n, WRITE_CHUNK_SIZE):
+                    protocol.transport.write(self.view[start:min(start + WRITE_CHUNK_SIZE, offset + n)])
+                    await protocol.drain()
+            count -= n
+            offset = 0
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+
+class _ServerProtocol(asyncio.BufferedProtocol):
+    # İlk satıra bakarak HTTP ya da speedtest.net TCP komut protokolü seçilir;
+    # ikisi de aynı portta sunulur.
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.sendfile = True
+        self._pending = bytearray()
+        self._mode = None
+        self._remaining = 0
+        self._upload = None
+        self._sending = None
+        self._paused = False
+        self._drain_waiter = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.stats.connections += 1
+        self.server.connections.add(self)
+
+    def connection_lost(self, exc):
+        self.server.connections.discard(self)
+        if self._sending is not None:
+            self._sending.cancel()
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_exception(exc or ConnectionResetError('connection lost'))
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    async def drain(self):
+        if self.transport.is_closing():
+            raise ConnectionResetError('connection lost')
+        if not self._paused:
+            return
+        self._drain_waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._drain_waiter
+        finally:
+            self._drain_waiter = None
+
+    def get_buffer(self, sizehint):
+        # Yükleme gövdeleri sunucu genelindeki tek bir tampona okunup atılır
+        return self.server.discard
+
+    def buffer_updated(self, nbytes):
+        data = self.server.discard[:nbytes]
+        if self._remaining:
+            n = min(self._remaining, nbytes)
+            self._discard(n)
+            data = data[n:]
+        if len(data):
+            self._pending += data
+        self._process()
+        if len(self._pending) > MAX_REQUEST_SIZE and self._sending is None:
+            self.transport.close()
+
+    def eof_received(self):
+        return False
+
+    def _discard(self, n):
+        self._remaining -= n
+        self.server.stats.bytes_received += n
+        if not self._remaining:
+            self._finish_upload()
+
+    def _process(self):
+        while not self._remaining and self._sending is None and not self.transport.is_closing():
+            if self._mode is None:
+                end = self._pending.find(b'\n')
+                if end < 0:
+                    return
+                self._mode = 'http' if _REQUEST_LINE.match(self._pending[:end]) else 'tcp'
+            handled = self._http_request() if self._mode == 'http' else self._command()
+            if not handled:
+                return
+
+    def _take(self, count):
+        # Başlığın ardından gelen gövde baytları tamponda olabilir
+        n = min(count, len(self._pending))
+        del self._pending[:n]
+        return n
+
+    def _http_request(self):
+        end = self._pending.find(b'\r\n\r\n')
+        if end < 0:
+            return False
+        lines = self._pending[:end].decode('latin-1').split('\r\n')
+        del self._pending[:end + 4]
+        self.server.stats.requests += 1
+
+        method, path, version = lines[0].split(' ', 2)
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        path = path.split('?', 1)[0]
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+        if method == 'POST':
+            size = int(headers.get('content-length', 0) or 0)
+            self._upload = ('http', size, keep_alive)
+            self._remaining = size
+            taken = self._take(size)
+            if taken:
+                self._discard(taken)
+            elif not size:
+                self._finish_upload()
+            return True
+
+        image = _IMAGE_PATH.search(path)
+        if method == 'GET' and image:
+            side = int(image.group(1))
+            size = IMAGE_SIZES.get(side, 2 * side * side)
+            if size > MAX_DOWNLOAD_SIZE:
+                self._respond(413, b'too large\n', keep_alive)
+            else:
+                head = self._head(200, size, keep_alive, 'image/jpeg')
+                self._start_download(head, size, b'', keep_alive)
+        elif method == 'GET' and path.endswith('/latency.txt'):
+            self._respond(200, b'test=test\n', keep_alive)
+        elif method == 'GET' and path.rstrip('/') in ('', '/speedtest'):
+            self._respond(200, f'Runner {__version__} reference server\n'.encode(), keep_alive)
+        else:
+            self._respond(404, b'not found\n', keep_alive)
+        return True
+
+    def _command(self):
+        end = self._pending.find(b'\n')
+        if end < 0:
+            return False
+        line = bytes(self._pending[:end + 1])
+        del self._pending[:end + 1]
+        self.server.stats.requests += 1
+        parts = line.split()
+        command = parts[0].upper() if parts else b''
+
+        if command == b'HI':
+            self.transport.write(f'HELLO 2.7 (Runner {__version__}) 2024-01-01.0000.0000000\n'.encode())
+        elif command == b'PING':
+            self.transport.write(f'PONG {time.time_ns() // 1000000}\n'.encode())
+        elif command == b'GETIP':
+            peer = self.transport.get_extra_info('peername') or ('',)
+            self.transport.write(f'YOURIP {peer[0]}\n'.encode())
+        elif command == b'DOWNLOAD' and len(parts) > 1 and parts[1].isdigit():
+            # Yanıt toplamda istenen boyuttadır: "DOWNLOAD " + veri + "\n"
+            size = min(max(int(parts[1]), 10), MAX_DOWNLOAD_SIZE)
+            self._start_download(b'DOWNLOAD ', size - 10, b'\n', True)
+        elif command == b'UPLOAD' and len(parts) > 1 and parts[1].isdigit():
+            size = int(parts[1])
+            self._upload = ('tcp', size, time.monotonic())
+            self._remaining = max(0, size - len(line))
+            taken = self._take(self._remaining)
+            if taken:
+                self._discard(taken)
+            elif not self._remaining:
+                self._finish_upload()
+        elif command == b'QUIT':
+            self.transport.close()
+        else:
+            self.transport.write(b'ERROR unknown command\n')
+        return True
+
+    def _finish_upload(self):
+        kind, size, extra = self._upload
+        self._upload = None
+        if kind == 'http':
+            self._respond(200, f'size={size}'.encode(), extra)
+        else:
+            elapsed = round((time.monotonic() - extra) * 1000)
+            self.transport.write(f'OK {size} {elapsed}\n'.encode())
+
+    def _head(self, status, length, keep_alive, content_type='text/plain'):
+        reason = {200: 'OK', 404: 'Not Found', 413: 'Payload Too Large'}[status]
+        return (
+            f'HTTP/1.1 {status} {reason}\r\n'
+            f'Server: Runner/{__version__}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {length}\r\n'
+            'Cache-Control: no-cache\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+        ).encode('latin-1')
+
+    def _respond(self, status, body, keep_alive):
+        self.transport.write(self._head(status, len(body), keep_alive) + body)
+        self.server.stats.bytes_sent += len(body)
+        if not keep_alive:
+            self.transport.close()
+
+    def _start_download(self, head, size, tail, keep_alive):
+        self._sending = asyncio.get_running_loop().create_task(self._download(head, size, tail, keep_alive))
+
+    async def _download(self, head, size, tail, keep_alive):
+        try:
+            self.transport.write(head)
+            await self.server.source.send(self, size)
+            self.server.stats.bytes_sent += size
+            if tail:
+                self.transport.write(tail)
+        except (ConnectionError, OSError, asyncio.CancelledError):
+            self.transport.close()
+            return
+        finally:
+            self._sending = None
+        if not keep_alive:
+            self.transport.close()
+        else:
+            self._process()
+
+
+class ReferenceServer:
+    def __init__(self, host='0.0.0.0', port=DEFAULT_PORT, source_size=SOURCE_SIZE):
+        self.host = host
+        self.port = port
+        self.source_size = source_size
+        self.stats = ServerStats()
+        self.connections = set()
+        self.discard = memoryview(bytearray(DISCARD_SIZE))
+        self.source = None
+        self._server = None
+
+    @property
+    def address(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'{host}:{port}'
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.source = await loop.run_in_executor(None, RandomSource, self.source_size)
+        self._server = await loop.create_server(
+            lambda: _ServerProtocol(self), self.host, self.port, reuse_address=True
+        )
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for connection in list(self.connections):
+                connection.transport.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
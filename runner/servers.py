@@ -0,0 +1,217 @@
+import gzip
+import heapq
+import json
+import math
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from .http import HTTPError, fetch
+
+CONFIG_URL = 'https://www.speedtest.net/speedtest-config.php'
+SERVER_URLS = (
+    'https://www.speedtest.net/speedtest-servers-static.php',
+    'https://c.speedtest.net/speedtest-servers-static.php',
+    'https://www.speedtest.net/speedtest-servers.php',
+    'https://c.speedtest.net/speedtest-servers.php',
+)
+SERVER_FIELDS = ('id', 'url', 'lat', 'lon', 'name', 'country', 'cc', 'sponsor', 'host')
+CONFIG_TTL = 60 * 60
+SERVERS_TTL = 24 * 60 * 60
+CACHE_VERSION = 1
+EARTH_RADIUS = 6371.0
+
+
+def cache_dir():
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'runner')
+
+
+def distance(lat1, lon1, lat2, lon2):
+    # Haversine, km
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _unit_vector(lat, lon):
+    # Birim küre üzerindeki kiriş uzaklığı büyük daire uzaklığıyla aynı sırayı verir
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+class GeoIndex:
+    # Dizi üzerinde örtük, dengeli bir k-d ağacı: order[mid] düğüm,
+    # [lo, mid) sol ve (mid, hi) sağ alt ağaçtır. `order` önbelleğe yazılır.
+
+    def __init__(self, servers, order=None):
+        self.servers = servers
+        self.points = [_unit_vector(float(s['lat']), float(s['lon'])) for s in servers]
+        if order is None or len(order) != len(servers):
+            order = list(range(len(servers)))
+            self._build(order, 0, len(order), 0)
+        self.order = order
+
+    def __len__(self):
+        return len(self.servers)
+
+    def _build(self, order, lo, hi, depth):
+        if hi - lo <= 1:
+            return
+        axis = depth % 3
+        order[lo:hi] = sorted(order[lo:hi], key=lambda i: self.points[i][axis])
+        mid = (lo + hi) // 2
+        self._build(order, lo, mid, depth + 1)
+        self._build(order, mid + 1, hi, depth + 1)
+
+    def nearest(self, lat, lon, k=10):
+        target = _unit_vector(lat, lon)
+        order, points = self.order, self.points
+        heap = []
+
+        def search(lo, hi, depth):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            index = order[mid]
+            point = points[index]
+            d2 = ((target[0] - point[0]) ** 2 + (target[1] - point[1]) ** 2
+                  + (target[2] - point[2]) ** 2)
+            if len(heap) < k:
+                heapq.heappush(heap, (-d2, index))
+            elif d2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-d2, index))
+            diff = target[depth % 3] - point[depth % 3]
+            if diff < 0:
+                near, far = (lo, mid), (mid + 1, hi)
+            else:
+                near, far = (mid + 1, hi), (lo, mid)
+            search(*near, depth + 1)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                search(*far, depth + 1)
+
+        search(0, len(order), 0)
+        nearest = []
+        for _, index in sorted(heap, reverse=True):
+            server = dict(self.servers[index])
+            server['d'] = distance(lat, lon, float(server['lat']), float(server['lon']))
+            nearest.append(server)
+        return nearest
+
+
+def parse_config(document):
+    root = ET.fromstring(document)
+    client = root.find('client')
+    server_config = root.find('server-config')
+    if client is None:
+        raise HTTPError('speedtest.net config has no client element')
+    ignore = server_config.get('ignoreids', '') if server_config is not None else ''
+    return {
+        'client': dict(client.attrib),
+        'ignore_ids': [int(i) for i in ignore.split(',') if i.strip().isdigit()],
+    }
+
+
+def parse_servers(document, ignore_ids=()):
+    ignore = set(ignore_ids)
+    servers = []
+    for element in ET.fromstring(document).iter('server'):
+        attrib = element.attrib
+        try:
+            if int(attrib.get('id', 0)) in ignore:
+                continue
+            float(attrib['lat'])
+            float(attrib['lon'])
+        except (KeyError, ValueError):
+            continue
+        servers.append({name: attrib.get(name, '') for name in SERVER_FIELDS})
+    return servers
+
+
+class ServerCache:
+    # Ayrıştırılmış yapılandırma ve sunucu listesi diskte sıkıştırılmış JSON
+    # olarak tutulur; sunucular satır listesi, k-d ağacı `order` dizisi olarak.
+
+    def __init__(self, path=None, config_ttl=CONFIG_TTL, servers_ttl=SERVERS_TTL, timeout=10.0):
+        self.path = path or os.path.join(cache_dir(), 'servers.json.gz')
+        self.config_ttl = config_ttl
+        self.servers_ttl = servers_ttl
+        self.timeout = timeout
+
+    def load(self):
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return data if data.get('version') == CACHE_VERSION else {}
+
+    def save(self, data):
+        data['version'] = CACHE_VERSION
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = f'{self.path}.{os.getpid()}.tmp'
+        with gzip.open(temporary, 'wt', encoding='utf-8') as handle:
+            json.dump(data, handle, separators=(',', ':'))
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def _fetch_servers(self, ignore_ids):
+        error = None
+        for url in SERVER_URLS:
+            try:
+                servers = parse_servers(await fetch(url, self.timeout), ignore_ids)
+            except (OSError, HTTPError, ET.ParseError, TimeoutError) as exc:
+                error = exc
+                continue
+            if servers:
+                return servers
+        raise error or HTTPError('speedtest.net returned no servers')
+
+    async def get(self, refresh=False):
+        data = self.load()
+        now = time.time()
+        changed = False
+
+        config = data.get('config')
+        if refresh or not config or now - config.get('fetched', 0) > self.config_ttl:
+            config = parse_config(await fetch(CONFIG_URL, self.timeout))
+            config['fetched'] = now
+            data['config'] = config
+            changed = True
+
+        stored = data.get('servers')
+        if refresh or not stored or now - stored.get('fetched', 0) > self.servers_ttl:
+            servers = await self._fetch_servers(config['ignore_ids'])
+            index = GeoIndex(servers)
+            data['servers'] = {
+                'fetched': now,
+                'fields': SERVER_FIELDS,
+                'rows': [[s[name] for name in SERVER_FIELDS] for s in servers],
+                'order': index.order,
+            }
+            changed = True
+        else:
+            fields = stored['fields']
+            index = GeoIndex([dict(zip(fields, row)) for row in stored['rows']], stored['order'])
+
+        if changed:
+            try:
+                self.save(data)
+            except OSError:
+                pass
+        return config, index
+
+    async def nearest(self, k=10, refresh=False):
+        config, index = await self.get(refresh)
+        client = config['client']
+        return index.nearest(float(client['lat']), float(client['lon']), k)
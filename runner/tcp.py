@@ -0,0 +1,263 @@
+import asyncio
+import time
+
+from .engine import PAYLOAD_SIZE, UPLOAD_SIZE, TransferEngine, payload_slice, upload_payload
+from .http import READ_BUFFER_SIZE, WRITE_CHUNK_SIZE, ProtocolError, unacknowledged
+from .latency import Endpoint
+
+# speedtest.net sunucularının 8080 portundaki metin protokolü:
+#   PING <ms>            -> PONG <ms>
+#   DOWNLOAD <n>         -> "DOWNLOAD " ile başlayan, \n ile biten n bayt
+#   UPLOAD <n> 0 + veri  -> OK <n> <ms>   (n komut satırını da içerir)
+MAX_LINE_SIZE = 4096
+
+_IDLE, _LINE, _COUNT = range(3)
+
+
+def split_host(server):
+    host, _, port = server.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f'expected host:port, got {server!r}')
+    return host.strip('[]'), int(port)
+
+
+class _TCPProtocol(asyncio.BufferedProtocol):
+    def __init__(self, loop, bufsize):
+        self._loop = loop
+        self._buffer = memoryview(bytearray(bufsize))
+        self._line = bytearray()
+        self._state = _IDLE
+        self._remaining = 0
+        self._on_data = None
+        self._waiter = None
+        self._paused = False
+        self._drain_waiter = None
+        self.transport = None
+        self.closed = False
+
+    @property
+    def idle(self):
+        return self._state == _IDLE
+
+    def expect_line(self):
+        return self._start(_LINE)
+
+    def expect_bytes(self, count, on_data):
+        self._remaining = count
+        self._on_data = on_data
+        return self._start(_COUNT)
+
+    def _start(self, state):
+        if self._state != _IDLE:
+            raise ProtocolError('connection is busy')
+        self._state = state
+        self._line.clear()
+        self._waiter = self._loop.create_future()
+        return self._waiter
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self._buffer
+
+    def buffer_updated(self, nbytes):
+        data = self._buffer[:nbytes]
+        if self._state == _COUNT:
+            n = min(self._remaining, nbytes)
+            self._remaining -= n
+            if self._on_data is not None:
+                self._on_data(n)
+            if not self._remaining:
+                self._finish(None)
+        elif self._state == _LINE:
+            self._line += data
+            end = self._line.find(b'\n')
+            if end >= 0:
+                self._finish(bytes(self._line[:end]).strip())
+            elif len(self._line) > MAX_LINE_SIZE:
+                self._fail(ProtocolError('reply line too long'))
+                self.transport.close()
+
+    def eof_received(self):
+        if self._state != _IDLE:
+            self._fail(ProtocolError('connection closed before reply completed'))
+        return False
+
+    def connection_lost(self, exc):
+        self.closed = True
+        if self._state != _IDLE:
+            self._fail(exc or ProtocolError('connection lost'))
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_exception(exc or ConnectionResetError('connection lost'))
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    async def drain(self):
+        if self.closed:
+            raise ConnectionResetError('connection lost')
+        if not self._paused:
+            return
+        self._drain_waiter = self._loop.create_future()
+        try:
+            await self._drain_waiter
+        finally:
+            self._drain_waiter = None
+
+    def _finish(self, result):
+        self._state = _IDLE
+        self._on_data = None
+        if not self._waiter.done():
+            self._waiter.set_result(result)
+
+    def _fail(self, exc):
+        self._state = _IDLE
+        self._on_data = None
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(exc)
+
+
+class TCPConnection:
+    def __init__(self, host, port, secure=False, bufsize=READ_BUFFER_SIZE, local_addr=None, address=None):
+        self.host = host
+        self.port = port
+        self.secure = False
+        self.bufsize = bufsize
+        self.local_addr = local_addr
+        # Önceden çözülmüş adres (bkz. ConnectionPool.resolve); yoksa host çözülür
+        self.address = address
+        self.requests = 0
+        self._transport = None
+        self._protocol = None
+
+    @property
+    def is_open(self):
+        return self._protocol is not None and not self._protocol.closed
+
+    @property
+    def is_idle(self):
+        return self.is_open and self._protocol.idle
+
+    async def connect(self, timeout=None):
+        loop = asyncio.get_running_loop()
+        self._transport, self._protocol = await asyncio.wait_for(
+            loop.create_connection(
+                lambda: _TCPProtocol(loop, self.bufsize), self.address or self.host, self.port,
+                local_addr=(self.local_addr, 0) if self.local_addr else None
+            ),
+            timeout
+        )
+
+    async def _exchange(self, waiter, parts, on_sent=None):
+        protocol = self._protocol
+        try:
+            for part in parts:
+                view = memoryview(part)
+                for offset in range(0, len(view), WRITE_CHUNK_SIZE):
+                    chunk = view[offset:offset + WRITE_CHUNK_SIZE]
+                    self._transport.write(chunk)
+                    # Aktarıma verilen bayt; onaylanmayanlar unacknowledged() ile bilinir
+                    if on_sent is not None:
+                        on_sent(len(chunk))
+                    await protocol.drain()
+            result = await waiter
+        except BaseException:
+            if not waiter.done():
+                waiter.cancel()
+            elif not waiter.cancelled():
+                waiter.exception()
+            self.abort()
+            raise
+        self.requests += 1
+        return result
+
+    async def ping(self, sequence, timeout):
+        started = time.perf_counter_ns()
+        waiter = self._protocol.expect_line()
+        reply = await asyncio.wait_for(
+            self._exchange(waiter, (f'PING {time.time_ns() // 1000000}\n'.encode(),)), timeout
+        )
+        rtt = time.perf_counter_ns() - started
+        if not reply.startswith(b'PONG'):
+            raise ProtocolError(f'unexpected ping reply from {self.host}: {reply[:32]!r}')
+        return started, rtt
+
+    async def download(self, size, on_data=None):
+        waiter = self._protocol.expect_bytes(size, on_data)
+        await self._exchange(waiter, (f'DOWNLOAD {size}\n'.encode(),))
+
+    async def upload(self, body, on_sent=None):
+        # Boyut komut satırını ve sondaki \n'i kapsar
+        size = len(body) + 1
+        while True:
+            header = f'UPLOAD {size} 0\n'.encode()
+            if len(header) + len(body) + 1 == size:
+                break
+            size = len(header) + len(body) + 1
+        waiter = self._protocol.expect_line()
+        reply = await self._exchange(waiter, (header, body, b'\n'), on_sent)
+        if not reply.startswith(b'OK'):
+            raise ProtocolError(f'unexpected upload reply from {self.host}: {reply[:32]!r}')
+        return reply
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+        if self._protocol is not None:
+            self._protocol.closed = True
+
+    def unacknowledged(self):
+        return unacknowledged(self._transport)
+
+    def abort(self):
+        # Yazma tamponundaki veri gönderilmeden bağlantı kesilir (iptal, hata)
+        if self._transport is not None:
+            self._transport.abort()
+        if self._protocol is not None:
+            self._protocol.closed = True
+
+
+def tcp_endpoint(server):
+    host, port = split_host(server)
+    return Endpoint(TCPConnection, host, port, False, lambda connection, sequence, timeout:
+                    connection.ping(sequence, timeout))
+
+
+class TCPTransferEngine(TransferEngine):
+    connection_class = TCPConnection
+
+    def __init__(self, server, **kwargs):
+        host, port = split_host(server)
+        super().__init__(f'tcp://{server}', **kwargs)
+        self.host, self.port, self.secure = host, port, False
+        self.server = server
+
+    @property
+    def latency_target(self):
+        return tcp_endpoint(self.server)
+
+
+class TCPDownloadEngine(TCPTransferEngine):
+    def __init__(self, server, size=UPLOAD_SIZE * 4, **kwargs):
+        super().__init__(server, **kwargs)
+        self.size = size
+
+    async def _transfer(self, connection, index, sequence):
+        await connection.download(self.size, self._count)
+
+
+class TCPUploadEngine(TCPTransferEngine):
+    def __init__(self, server, size=UPLOAD_SIZE, payload=None, **kwargs):
+        super().__init__(server, **kwargs)
+        self.payload = payload if payload is not None else upload_payload(max(PAYLOAD_SIZE, 2 * size))
+        self.size = min(size, len(self.payload))
+
+    async def _transfer(self, connection, index, sequence):
+        body = payload_slice(self.payload, self.size, index, sequence)
+        await self._acknowledged(connection, lambda on_sent: connection.upload(body, on_sent))
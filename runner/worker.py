@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import threading
+import time
+
+from .interfaces import local_interfaces
+from .pipeline import CancelToken, cancelled_result, open_backend, run_phases
+
+log = logging.getLogger(__name__)
+
+# Seçilen sunucu bu süre boyunca yeniden seçilmez
+SERVER_TTL = 30 * 60
+# Arka uç (yapılandırma, sunucu listesi, bağlantı havuzu) en fazla bu süre sıcak tutulur
+BACKEND_TTL = 6 * 60 * 60
+# Seçilen sunucunun boştaki gecikmesi seçimdekinin bu katını (+ ms) aşarsa yeniden seçilir
+LATENCY_DRIFT = 2.0
+LATENCY_SLACK = 5.0
+
+
+def network_fingerprint():
+    # Yerel adresler değişirse (arayüz, VPN, yeni DHCP kirası) sıcak durum geçersizdir
+    try:
+        return tuple(sorted(interface.address for interface in local_interfaces(include_ipv6=True)))
+    except OSError:
+        return None
+
+
+class MeasurementWorker:
+    # Ardışık testler için açık tutulan arka uç: speedtest yapılandırması ve
+    # sunucu listesi, bağlantı havuzu ve çözülmüş adresler ile seçilen sunucu
+    # çalıştırmalar arasında saklanır. Geçersiz kılma:
+    #   - sunucu `server_ttl` dolunca ya da boştaki gecikmesi belirgin artınca yeniden seçilir,
+    #   - arka uç `backend_ttl` dolunca, yerel adresler değişince ya da bir test
+    #     hata verince yeniden kurulur,
+    #   - invalidate() her şeyi bırakır (ör. ayarlar değişti).
+    # Tek bir olay döngüsüne bağlıdır; testler sırayla yapılır.
+
+    def __init__(self, backend_factory, server_ttl=SERVER_TTL, backend_ttl=BACKEND_TTL):
+        self.backend_factory = backend_factory
+        self.server_ttl = server_ttl
+        self.backend_ttl = backend_ttl
+        self.backend = None
+        self.server = None
+        self.runs = 0
+        self.warm_runs = 0
+        self._opened = 0.0
+        self._selected = 0.0
+        self._baseline = None
+        self._network = None
+        self._lock = None
+
+    @property
+    def warm(self):
+        return self.backend is not None
+
+    async def invalidate(self):
+        self.server = None
+        if self.backend is not None:
+            backend, self.backend = self.backend, None
+            await backend.close()
+
+    async def _expire(self):
+        now = time.monotonic()
+        network = network_fingerprint()
+        if self.backend is not None:
+            if now - self._opened >= self.backend_ttl:
+                log.info('measurement backend expired, reopening')
+                await self.invalidate()
+            elif network != self._network:
+                log.info('local addresses changed, reopening measurement backend')
+                await self.invalidate()
+        if self.server is not None and now - self._selected >= self.server_ttl:
+            self.server = None
+        return now, network
+
+    async def measure(self, progress=None, on_sample=None, cancel=None):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        cancel = cancel or CancelToken()
+        async with self._lock:
+            now, network = await self._expire()
+            if self.backend is None:
+                backend = self.backend_factory()
+                if not await open_backend(backend, cancel):
+                    return cancelled_result(backend)
+                self.backend, self._opened, self._network = backend, now, network
+            server = self.server
+            try:
+                result = await run_phases(self.backend, progress, on_sample, cancel, server)
+            except Exception:
+                # Hatadan sonra hiçbir şeye güvenilmez; sonraki test soğuk başlar
+                await self.invalidate()
+                raise
+            self.runs += 1
+            if server is None:
+                if result.server is not None and result.latency:
+                    self.server, self._selected, self._baseline = result.server, time.monotonic(), result.ping
+            else:
+                self.warm_runs += 1
+                if result.latency and result.ping > self._baseline * LATENCY_DRIFT + LATENCY_SLACK:
+                    log.info('latency to %s rose from %.1f to %.1f ms, reselecting',
+                             server.get('host'), self._baseline, result.ping)
+                    self.server = None
+            return result
+
+
+class BackgroundWorker:
+    # MeasurementWorker'ı kendi olay döngüsünü çalıştıran bir iş parçacığında
+    # barındırır; döngü ve bağlantılar testler arasında yaşar. Engelleyen
+    # çağıranlar (ör. arayüzün QThread'i) için.
+
+    def __init__(self, backend_factory, **options):
+        self.worker = MeasurementWorker(backend_factory, **options)
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _submit(self, coroutine):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='runner-worker', daemon=True)
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def measure(self, progress=None, on_sample=None, cancel=None):
+        # Geri çağrılar işçi iş parçacığında çalışır
+        return self._submit(self.worker.measure(progress, on_sample, cancel)).result()
+
+    def invalidate(self):
+        if self._loop is not None:
+            self._submit(self.worker.invalidate()).result()
+
+    def close(self, timeout=None):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.worker.invalidate(), loop).result(timeout)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
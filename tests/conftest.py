@@ -0,0 +1,42 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-slow', action='store_true', help='run slow, timing-dependent integration tests')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: slow, timing-dependent integration test (needs --run-slow)')
+
+
+def pytest_collection_modifyitems(config, items):
+    # Şekillendirilmiş bağlantı testleri uzun sürer ve makinenin zamanlamasına bağlıdır
+    if config.getoption('--run-slow'):
+        return
+    skip = pytest.mark.skip(reason='slow; use --run-slow')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def history_store(tmp_path):
+    # İki sunucuda 1000..6000 zamanlı altı ölçüm; biri kararlı verimsiz ve bufferbloat'suz
+    from runner.engine import PhaseResult
+    from runner.history import HistoryStore
+    from runner.pipeline import MeasurementResult
+    from runner.pool import PoolStats
+
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'), retention_days=None)
+    for i in range(6):
+        host = ('a.example:8080', 'b.example:8080')[i % 2]
+        server = {'id': 100 + i % 2, 'sponsor': f'Sponsor {i % 2}', 'name': 'City', 'host': host}
+        download = PhaseResult(1_250_000 * (i + 1), 1.0, 4, steady_bits_per_second=None if i == 3 else 1e7 * (i + 1))
+        upload = PhaseResult(625_000 * (i + 1), 1.0, 2)
+        store.add(MeasurementResult(
+            'http', server, {'p50': 10.0 + i, 'jitter': 0.5 * i}, download, upload,
+            None if i == 3 else {'grade': 'A'}, PoolStats(opened=2), timestamp=1000.0 * (i + 1),
+        ))
+    store.flush()
+    yield store
+    store.close()
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from runner.backends import create_backend
+from runner.pipeline import run_test
+from runner.server import ReferenceServer
+
+SOURCE_SIZE = 4 * 1024 * 1024
+
+
+async def measure(backend):
+    server = await ReferenceServer('127.0.0.1', 0, SOURCE_SIZE).start()
+    try:
+        return await run_test(create_backend(backend, servers=[server.address],
+                                             duration=1, streams=2, max_streams=2))
+    finally:
+        await server.close()
+
+
+@pytest.mark.parametrize('backend', ['http', 'tcp'])
+def test_upload_reuses_download_connections(backend):
+    # İndirme akışları bağlantıyı havuza bırakır; yükleme yeni el sıkışma yapmaz
+    result = asyncio.run(measure(backend))
+    assert result.upload.pool.opened == 0
+    assert result.upload.pool.reused == result.upload.streams
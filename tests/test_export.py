@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from runner.export import EXPORT_COLUMNS, export_history, parse_time, read_columnar, write_columnar
+
+
+def stored(store, **filters):
+    return [tuple(row[name] for name in EXPORT_COLUMNS) for row in store.query(columns=EXPORT_COLUMNS, **filters)]
+
+
+def columnar_rows(data):
+    rows = []
+    for block in read_columnar(io.BytesIO(data)):
+        rows.extend(zip(*(block[name] for name in EXPORT_COLUMNS)))
+    return rows
+
+
+def test_csv_round_trip(history_store, tmp_path):
+    path = tmp_path / 'history.csv'
+    assert export_history(history_store, str(path), 'csv') == 6
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        assert tuple(next(reader)) == EXPORT_COLUMNS
+        rows = list(reader)
+    expected = [['' if value is None else str(value) for value in row] for row in stored(history_store)]
+    assert rows == expected
+
+
+def test_jsonl_round_trip(history_store, tmp_path):
+    path = tmp_path / 'history.jsonl'
+    assert export_history(history_store, str(path), 'jsonl') == 6
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 6
+    for record, row in zip(records, stored(history_store)):
+        expected = dict(zip(EXPORT_COLUMNS, row))
+        expected['metadata'] = json.loads(expected['metadata'])
+        assert record == expected
+    assert records[0]['metadata']['pool']['opened'] == 2
+
+
+def test_columnar_round_trip_keeps_nulls(history_store):
+    f = io.BytesIO()
+    assert export_history(history_store, f, 'columnar') == 6
+    rows = columnar_rows(f.getvalue())
+    assert rows == stored(history_store)
+    assert rows[3][EXPORT_COLUMNS.index('download_steady')] is None
+    assert rows[3][EXPORT_COLUMNS.index('bufferbloat')] is None
+
+
+def test_columnar_spans_blocks(history_store):
+    f = io.BytesIO()
+    chunks = history_store.chunks(columns=EXPORT_COLUMNS, size=2)
+    assert write_columnar(chunks, f, EXPORT_COLUMNS, block_size=4) == 6
+    assert len(list(read_columnar(io.BytesIO(f.getvalue())))) == 2
+    assert columnar_rows(f.getvalue()) == stored(history_store)
+
+
+def test_export_filters(history_store):
+    f = io.StringIO()
+    assert export_history(history_store, f, 'jsonl', since=2000, until=5000, server='b.example:8080') == 2
+    records = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert [record['timestamp'] for record in records] == [2000.0, 4000.0]
+
+
+def test_export_rejects_unknown_format(history_store):
+    with pytest.raises(ValueError):
+        export_history(history_store, io.StringIO(), 'xml')
+
+
+@pytest.mark.parametrize('data', [b'NOPE', b'RCOL\x09', b'RCOL\x01\x10\x00\x00\x00{'])
+def test_read_columnar_rejects_bad_files(data):
+    with pytest.raises(ValueError):
+        list(read_columnar(io.BytesIO(data)))
+
+
+def test_parse_time():
+    assert parse_time('7d', now=1_000_000.0) == 1_000_000.0 - 7 * 24 * 60 * 60
+    assert parse_time('1.5h', now=10_000.0) == 10_000.0 - 5400
+    assert parse_time('1700000000') == 1700000000.0
+    assert parse_time('2026-01-05T10:00:00') == datetime(2026, 1, 5, 10).timestamp()
+    with pytest.raises(ValueError):
+        parse_time('yesterday')
@@ -0,0 +1,27 @@
+import asyncio
+
+from runner.backends import create_backend
+from runner.fleet import run_fleet
+from runner.server import ReferenceServer
+
+SOURCE_SIZE = 4 * 1024 * 1024
+
+
+async def parallel_fleet():
+    servers = [await ReferenceServer('127.0.0.1', 0, SOURCE_SIZE).start() for _ in range(2)]
+    try:
+        backend = create_backend('http', servers=[server.address for server in servers],
+                                 duration=1, streams=2, max_streams=2)
+        return await run_fleet(backend, parallel=2)
+    finally:
+        for server in servers:
+            await server.close()
+
+
+def test_parallel_targets_report_their_own_pool_stats():
+    # Havuz iki hedefçe paylaşılır; her hedef yalnızca kendi akışlarının bağlantılarını sayar
+    report = asyncio.run(parallel_fleet())
+    assert len(report.results) == 2
+    for result in report.results:
+        streams = result.download.streams + result.upload.streams
+        assert result.pool.opened + result.pool.reused == streams
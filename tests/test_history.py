@@ -0,0 +1,73 @@
+import json
+import time
+
+import pytest
+
+from runner.engine import PhaseResult
+from runner.history import HistoryStore
+from runner.pipeline import MeasurementResult
+
+
+def timestamps(store, **filters):
+    return [row['timestamp'] for row in store.query(columns=('timestamp',), **filters)]
+
+
+def test_result_row_columns(history_store):
+    row = next(history_store.query(limit=1))
+    assert row['backend'] == 'http'
+    assert row['server_id'] == '100'
+    assert row['server_name'] == 'Sponsor 0'
+    assert row['server_host'] == 'a.example:8080'
+    assert row['ping'] == 10.0
+    assert row['download'] == 1e7
+    assert row['upload'] == 5e6
+    assert row['bufferbloat'] == 'A'
+    metadata = json.loads(row['metadata'])
+    assert metadata['download']['streams'] == 4
+    assert metadata['pool']['opened'] == 2
+
+
+def test_time_filters(history_store):
+    assert timestamps(history_store) == [1000.0, 2000.0, 3000.0, 4000.0, 5000.0, 6000.0]
+    assert timestamps(history_store, since=3000) == [3000.0, 4000.0, 5000.0, 6000.0]
+    assert timestamps(history_store, until=3000) == [1000.0, 2000.0]
+    assert timestamps(history_store, since=2000, until=4000) == [2000.0, 3000.0]
+
+
+def test_server_filter(history_store):
+    assert timestamps(history_store, server='a.example:8080') == [1000.0, 3000.0, 5000.0]
+    assert len(timestamps(history_store, server=['a.example:8080', 'b.example:8080'])) == 6
+    assert timestamps(history_store, server='c.example:8080') == []
+
+
+def test_limit_and_order(history_store):
+    assert timestamps(history_store, newest_first=True, limit=2) == [6000.0, 5000.0]
+    assert timestamps(history_store, limit=2) == [1000.0, 2000.0]
+
+
+def test_chunks_are_bounded(history_store):
+    sizes = [len(rows) for rows in history_store.chunks(size=4)]
+    assert sizes == [4, 2]
+
+
+def test_columns(history_store):
+    row = next(history_store.query(columns=('id', 'download')))
+    assert set(row) == {'id', 'download'}
+    with pytest.raises(ValueError):
+        list(history_store.query(columns=('download; DROP TABLE results',)))
+
+
+def test_prune(history_store):
+    assert history_store.prune(3500) == 3
+    assert timestamps(history_store) == [4000.0, 5000.0, 6000.0]
+    assert history_store.count() == 3
+
+
+def test_writer_prunes_past_retention(history_store):
+    # Yazıcı ilk toplu yazmada saklama süresinden eski kayıtları siler
+    history_store.close()
+    with HistoryStore(history_store.path, retention_days=1) as store:
+        store.add(MeasurementResult('http', {'host': 'a.example:8080'}, {'p50': 10.0},
+                                    PhaseResult(1, 1.0, 1), PhaseResult(1, 1.0, 1)))
+        store.flush()
+        assert timestamps(store) == [pytest.approx(time.time(), abs=60)]
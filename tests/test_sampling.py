@@ -0,0 +1,26 @@
+from runner.sampling import SAMPLE_CAPACITY, SAMPLE_INTERVAL, ThroughputSampler, steady_state
+
+RATE = 1e7
+
+
+def constant_phase(count):
+    sampler = ThroughputSampler(SAMPLE_INTERVAL, SAMPLE_CAPACITY)
+    nbytes = round(RATE / 8 * SAMPLE_INTERVAL)
+    for i in range(1, count + 1):
+        sampler.record(i * SAMPLE_INTERVAL, nbytes, SAMPLE_INTERVAL)
+    return sampler.samples
+
+
+def test_steady_state_constant_rate():
+    ramp, steady = steady_state(constant_phase(300))
+    assert ramp == 0.0
+    assert abs(steady / RATE - 1) < 1e-6
+
+
+def test_steady_state_after_ring_wrapped():
+    # 3000 örnek, halka 1200 tutar: süre de eldeki örneklerden ölçülmeli
+    samples = constant_phase(3000)
+    assert len(samples) == SAMPLE_CAPACITY
+    ramp, steady = steady_state(samples)
+    assert ramp == 0.0
+    assert abs(steady / RATE - 1) < 1e-6
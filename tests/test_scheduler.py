@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+
+from runner.scheduler import CronSchedule, IntervalSchedule, parse_schedule
+
+
+def at(*fields):
+    return datetime(*fields).timestamp()
+
+
+def next_run(expression, *after):
+    return datetime.fromtimestamp(CronSchedule(expression).next(at(*after)))
+
+
+def test_cron_step_minutes():
+    assert next_run('*/15 * * * *', 2026, 1, 5, 10, 7) == datetime(2026, 1, 5, 10, 15)
+    # Tam eşleşen an atlanır; bir sonraki çalıştırma her zaman sonradır
+    assert next_run('*/15 * * * *', 2026, 1, 5, 10, 15) == datetime(2026, 1, 5, 10, 30)
+
+
+def test_cron_rolls_over_day_month_and_year():
+    assert next_run('30 9 * * *', 2026, 1, 5, 23, 59) == datetime(2026, 1, 6, 9, 30)
+    assert next_run('0 0 1 * *', 2026, 1, 31, 12, 0) == datetime(2026, 2, 1)
+    assert next_run('0 0 1 1 *', 2026, 3, 1, 0, 0) == datetime(2027, 1, 1)
+
+
+def test_cron_weekdays():
+    # 10 Ocak 2026 Cumartesi; hafta içi ilk gün 12 Ocak Pazartesi
+    assert next_run('0 9 * * 1-5', 2026, 1, 10, 12, 0) == datetime(2026, 1, 12, 9, 0)
+    # 7 de Pazar'dır
+    assert next_run('0 9 * * 7', 2026, 1, 5, 12, 0) == datetime(2026, 1, 11, 9, 0)
+
+
+def test_cron_day_of_month_or_weekday():
+    # İkisi de kısıtlıysa cron'daki gibi biri yeterli: ayın 13'ü ya da Cuma
+    assert next_run('0 0 13 * 5', 2026, 1, 5, 12, 0) == datetime(2026, 1, 9)
+    assert next_run('0 0 13 * 5', 2026, 1, 10, 12, 0) == datetime(2026, 1, 13)
+
+
+def test_cron_lists_and_ranges():
+    schedule = CronSchedule('5,35 8-10/2 * * *')
+    assert schedule.minutes == {5, 35}
+    assert schedule.hours == {8, 10}
+    assert next_run('5,35 8-10/2 * * *', 2026, 1, 5, 8, 40) == datetime(2026, 1, 5, 10, 5)
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '* 24 * * *', '5-1 * * * *', '*/0 * * * *'])
+def test_cron_rejects_invalid_fields(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_cron_that_never_fires():
+    with pytest.raises(ValueError):
+        CronSchedule('0 0 30 2 *').next(at(2026, 1, 1))
+
+
+def test_parse_schedule():
+    assert parse_schedule('900').seconds == 900
+    assert parse_schedule('15m').seconds == 900
+    assert parse_schedule('2h').seconds == 7200
+    assert isinstance(parse_schedule('@hourly'), CronSchedule)
+    assert parse_schedule('@daily').expression == '0 0 * * *'
+    assert isinstance(parse_schedule('*/5 * * * *'), CronSchedule)
+    assert IntervalSchedule(60).next(100.0) == 160.0
+    for spec in ('soon', '0', '-5m'):
+        with pytest.raises(ValueError):
+            parse_schedule(spec)
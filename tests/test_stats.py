@@ -0,0 +1,67 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from runner.latency import LatencySeries
+from runner.stats import P2Quantile, RunningStats
+
+
+def exact(values, p):
+    ordered = sorted(values)
+    rank = p * (len(ordered) - 1)
+    lo = math.floor(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+@pytest.mark.parametrize('distribution', ['uniform', 'lognormal', 'gauss'])
+@pytest.mark.parametrize('p', [0.5, 0.95, 0.99])
+def test_p2_tracks_exact_quantile(distribution, p):
+    rng = random.Random(7)
+    draw = {
+        'uniform': lambda: rng.uniform(0, 100),
+        'lognormal': lambda: rng.lognormvariate(3, 0.5),
+        'gauss': lambda: rng.gauss(50, 10),
+    }[distribution]
+    values = [draw() for _ in range(20000)]
+    estimator = P2Quantile(p)
+    for value in values:
+        estimator.add(value)
+    assert abs(estimator.value() / exact(values, p) - 1) < 0.02
+
+
+def test_p2_is_exact_with_few_samples():
+    estimator = P2Quantile(0.5)
+    assert math.isnan(estimator.value())
+    for value in (40, 10, 30, 20):
+        estimator.add(value)
+    assert estimator.value() == 25
+    estimator.add(50)
+    assert estimator.value() == 30
+
+
+def test_running_stats():
+    values = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count == len(values)
+    assert stats.min == 1.0 and stats.max == 9.0
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+    assert stats.stdev == pytest.approx(statistics.stdev(values))
+
+
+def test_latency_percentiles_exact_until_ring_wraps():
+    rng = random.Random(3)
+    series = LatencySeries(capacity=100)
+    rtts = [rng.randrange(1_000_000, 50_000_000) for _ in range(100)]
+    for rtt in rtts:
+        series.add(rtt)
+    assert series.percentile(0.99) == pytest.approx(exact(rtts, 0.99))
+    # Halka taştıktan sonra tüm örnekleri gören P² kullanılır
+    series.add(1_000_000_000)
+    assert series.percentile(0.99) == series.quantiles[0.99].value()
+    assert series.summary()['max'] == 1000.0
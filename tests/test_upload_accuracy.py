@@ -0,0 +1,33 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from accuracy import ShapedServer  # noqa: E402
+from runner.backends import create_backend  # noqa: E402
+from runner.pipeline import run_test  # noqa: E402
+
+RATE = 20e6
+LATENCY = 0.02
+# Düzenek vekili okuduğu baytı erken onaylar; ~%5'e kadarı düzenekten gelir
+TOLERANCE = 0.15
+
+
+async def measure(backend):
+    server = await ShapedServer(RATE, LATENCY).start()
+    try:
+        return await run_test(create_backend(backend, servers=[server.address], duration=3))
+    finally:
+        await server.close()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('backend', ['http', 'tcp'])
+def test_upload_counts_acknowledged_bytes(backend):
+    # Yazılan ama bağlantıdan geçmemiş baytlar sayılırsa yükleme 20 Mbps'de birkaç kat çıkar
+    result = asyncio.run(measure(backend))
+    assert abs(result.upload.bits_per_second / RATE - 1) < TOLERANCE
+    assert abs(result.download.bits_per_second / RATE - 1) < TOLERANCE